@@ -234,7 +234,7 @@ const AnalysisResultPage = () => {
                             <div className="flex gap-4 overflow-x-auto pb-2">
                                 {similarCases.map((scan) => (
                                     <div key={scan.id} className="min-w-[150px] rounded-xl overflow-hidden border border-[#f0f4f0] dark:border-[#2a3c2e] bg-white cursor-pointer hover:shadow-md transition-all" onClick={() => navigate('/analysis/result', { state: { result: { disease: scan.disease }, image: scan.image } })}>
-                                        <img src={scan.image} className="w-full h-24 object-cover" alt="Similar case" />
+                                        <img src={scan.thumbnail || scan.image} className="w-full h-24 object-cover" alt="Similar case" />
                                         <div className="p-3">
                                             <p className="font-bold text-xs text-text-main dark:text-white truncate">{scan.disease?.split('___')[1] || scan.disease}</p>
                                             <div className="flex justify-between items-center mt-1">
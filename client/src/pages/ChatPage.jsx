@@ -7,7 +7,9 @@ const ChatPage = () => {
     const [messages, setMessages] = useState([]);
     const [input, setInput] = useState('');
     const [loading, setLoading] = useState(false);
+    const [nextCursor, setNextCursor] = useState(null);
     const messagesEndRef = useRef(null);
+    const keepScrollRef = useRef(false);
 
     const scrollToBottom = () => {
         messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -18,13 +20,26 @@ const ChatPage = () => {
     }, []);
 
     useEffect(() => {
+        // Prepending earlier messages shouldn't jump to the bottom
+        if (keepScrollRef.current) {
+            keepScrollRef.current = false;
+            return;
+        }
         scrollToBottom();
     }, [messages, loading]);
 
-    const loadHistory = async () => {
+    // History comes newest first, one window at a time; older windows are fetched on demand
+    const loadHistory = async (cursor = null) => {
         try {
-            const response = await api.get('/chat/history');
-            setMessages(response.data);
+            const response = await api.get('/chat/history', { params: cursor ? { cursor } : {} });
+            const older = [...response.data].reverse();
+            if (cursor) {
+                keepScrollRef.current = true;
+                setMessages(prev => [...older, ...prev]);
+            } else {
+                setMessages(older);
+            }
+            setNextCursor(response.headers['x-next-cursor'] || null);
         } catch (err) {
             console.error("Failed to load chat history", err);
         }
@@ -41,23 +56,69 @@ const ChatPage = () => {
         setInput('');
         setLoading(true);
 
+        // Placeholder bot message that the streamed reply is appended to
+        setMessages(prev => [...prev, { role: 'bot', message: '' }]);
+        const setBotMessage = (update) => setMessages(prev => {
+            const next = [...prev];
+            next[next.length - 1] = { role: 'bot', message: update(next[next.length - 1].message) };
+            return next;
+        });
+
         try {
-            const response = await api.post('/chat/message', {
-                message: userMsg.message,
-                language: language
+            const streamed = await streamReply(userMsg.message, (delta) => {
+                setLoading(false);
+                setBotMessage(current => current + delta);
             });
 
-            const botMsg = { role: 'bot', message: response.data.reply };
-            setMessages(prev => [...prev, botMsg]);
+            if (!streamed) {
+                // Stream unavailable (e.g. expired token): the axios client handles refresh
+                const response = await api.post('/chat/message', {
+                    message: userMsg.message,
+                    language: language
+                });
+                setBotMessage(() => response.data.reply);
+            }
         } catch (err) {
             console.error(err);
-            const errorMsg = { role: 'bot', message: "Sorry, I couldn't reach the server. Please check your connection." };
-            setMessages(prev => [...prev, errorMsg]);
+            setBotMessage(current => current || "Sorry, I couldn't reach the server. Please check your connection.");
         } finally {
             setLoading(false);
         }
     };
 
+    // Reads the reply as Server-Sent Events; resolves false if the server didn't start a stream
+    const streamReply = async (message, onDelta) => {
+        const token = localStorage.getItem('access_token');
+        const response = await fetch(`${import.meta.env.VITE_API_BASE_URL}/chat/message`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+                ...(token ? { Authorization: `Bearer ${token}` } : {})
+            },
+            body: JSON.stringify({ message, language })
+        });
+        if (!response.ok || !response.body) return false;
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+            for (const block of events) {
+                const event = block.match(/^event: (.*)$/m)?.[1];
+                const data = block.match(/^data: (.*)$/m)?.[1];
+                if (event === 'delta' && data) onDelta(JSON.parse(data).text);
+            }
+        }
+        return true;
+    };
+
     const suggestedQuestions = [
         "How do I treat Early Blight in tomatoes?",
         "What is the best fertilizer for corn?",
@@ -97,8 +158,17 @@ const ChatPage = () => {
                 )}
 
                 <div className="flex flex-col gap-6">
+                    {nextCursor && (
+                        <button
+                            onClick={() => loadHistory(nextCursor)}
+                            className="self-center text-xs font-medium text-text-light dark:text-text-secondary-dark hover:text-primary transition-colors"
+                        >
+                            Load earlier messages
+                        </button>
+                    )}
                     {messages.map((msg, index) => {
                         const isBot = msg.role === 'bot';
+                        if (isBot && !msg.message) return null; // Reply not started yet: typing indicator shows instead
                         return (
                             <div key={index} className={`flex gap-4 ${isBot ? 'justify-start' : 'justify-end'}`}>
                                 {isBot && (
@@ -167,7 +167,7 @@ const Dashboard = () => {
                                         {scan.status}
                                     </span>
                                 </div>
-                                <img src={scan.image} alt={scan.title} className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-500" />
+                                <img src={scan.thumbnail || scan.image} alt={scan.title} className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-500" />
                             </div>
                             <div className="flex justify-between items-end">
                                 <div>
@@ -24,12 +24,24 @@ const SoilPage = () => {
     const [lastSyncData, setLastSyncData] = useState(null);
 
     React.useEffect(() => {
+        if (!isLiveSync) return;
+
+        fetchSensorData(true); // Initial snapshot
+
+        // Readings are pushed over SSE; fall back to polling only if the stream is unavailable
         let interval;
-        if (isLiveSync) {
-            fetchSensorData(true); // Initial fetch
-            interval = setInterval(() => fetchSensorData(true), 5000);
-        }
-        return () => clearInterval(interval);
+        const source = new EventSource(`${import.meta.env.VITE_API_BASE_URL}/soil/stream`);
+        source.addEventListener('reading', (event) => applySensorData(JSON.parse(event.data), true));
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED && !interval) {
+                interval = setInterval(() => fetchSensorData(true), 5000);
+            }
+        };
+
+        return () => {
+            source.close();
+            clearInterval(interval);
+        };
     }, [isLiveSync]);
 
     const simulateIoT = () => {
@@ -45,31 +57,33 @@ const SoilPage = () => {
         });
     };
 
+    const applySensorData = (data, autoAnalyze = false) => {
+        const newData = {
+            nitrogen: data.nitrogen,
+            phosphorus: data.phosphorus,
+            potassium: data.potassium,
+            ph: data.ph,
+            moisture: data.moisture,
+            temperature: data.temperature,
+            rainfall: formData.rainfall || '100'
+        };
+
+        setFormData(newData);
+
+        // If data changed and autoAnalyze is on, trigger analysis
+        if (autoAnalyze) {
+            const dataString = JSON.stringify({ ...data, rainfall: newData.rainfall });
+            if (dataString !== lastSyncData) {
+                setLastSyncData(dataString);
+                performAnalysis(newData);
+            }
+        }
+    };
+
     const fetchSensorData = async (autoAnalyze = false) => {
         try {
             const response = await api.get('/soil/latest');
-            const data = response.data;
-
-            const newData = {
-                nitrogen: data.nitrogen,
-                phosphorus: data.phosphorus,
-                potassium: data.potassium,
-                ph: data.ph,
-                moisture: data.moisture,
-                temperature: data.temperature,
-                rainfall: formData.rainfall || '100'
-            };
-
-            setFormData(newData);
-
-            // If data changed and autoAnalyze is on, trigger analysis
-            if (autoAnalyze) {
-                const dataString = JSON.stringify({ ...data, rainfall: newData.rainfall });
-                if (dataString !== lastSyncData) {
-                    setLastSyncData(dataString);
-                    performAnalysis(newData);
-                }
-            }
+            applySensorData(response.data, autoAnalyze);
         } catch (err) {
             console.error("Failed to fetch sensor data", err);
             setError("Sync/Fetch Error: Check server connection or if sensors are active.");
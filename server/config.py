@@ -17,6 +17,14 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # 15 minutes
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    USER_CACHE_SIZE: int = 1024  # Authenticated user lookups; 0 disables the cache
+    USER_CACHE_TTL_SECONDS: float = 30.0
+
+    # Password Hashing (argon2id; existing hashes are upgraded on the next login)
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 2  # Concurrent hashes per worker process
 
     # Payments
     RAZORPAY_KEY_ID: str = "rzp_test_placeholder"
@@ -26,6 +34,16 @@ class Settings(BaseSettings):
     # AI Services
     GEMINI_API_KEY: Optional[str] = None
     GROQ_API_KEY: Optional[str] = None
+    GROQ_BASE_URL: Optional[str] = None  # Override to point chat at a local stub (scripts/stub_chat_server.py)
+    CHAT_MAX_CONNECTIONS: int = 20  # Pooled keep-alive connections to the LLM API, per worker
+    CHAT_TIMEOUT_SECONDS: float = 60.0
+    CHAT_CONTEXT_TURNS: int = 6  # Previous exchanges sent to the model with each message
+    CHAT_CONTEXT_TOKENS: int = 1500  # Budget for those exchanges (estimated); older ones are dropped first
+
+    # Chat Response Cache (exact and near-duplicate questions, per language); size 0 disables it
+    CHAT_CACHE_SIZE: int = 2048
+    CHAT_CACHE_TTL_SECONDS: float = 86400.0
+    CHAT_CACHE_SIMILARITY: float = 0.9  # Cosine similarity a rephrased question needs to reuse a reply
     
     # Model Paths
     LEAF_MODEL_PATH: str = os.path.join(BASE_DIR, "models/final_model.h5")
@@ -35,6 +53,51 @@ class Settings(BaseSettings):
     
     ROOT_MODEL_PATH: str = os.path.join(BASE_DIR, "models/root_model.h5")
     ROOT_CLASS_INDICES_PATH: str = os.path.join(BASE_DIR, "models/root_class_indices.json")
+    TREATMENTS_PATH: str = os.path.join(BASE_DIR, "models/treatments.json")
+    TREATMENTS_RELOAD_SECONDS: float = 5.0  # How often to check the file for edits
+
+    # Inference Backend: "keras" (default), "tflite" or "onnx" (see scripts/export_models.py)
+    INFERENCE_BACKEND: str = "keras"
+    INFERENCE_THREADS: Optional[int] = None
+    LEAF_TFLITE_PATH: str = os.path.join(BASE_DIR, "models/final_model.tflite")
+    LEAF_ONNX_PATH: str = os.path.join(BASE_DIR, "models/final_model.onnx")
+    ROOT_TFLITE_PATH: str = os.path.join(BASE_DIR, "models/root_model.tflite")
+    ROOT_ONNX_PATH: str = os.path.join(BASE_DIR, "models/root_model.onnx")
+
+    # Upload Storage: "local" (UPLOAD_DIR, served under /static) or "s3" (any S3-compatible store)
+    STORAGE_BACKEND: str = "local"
+    UPLOAD_DIR: str = "static/uploads"
+    UPLOAD_URL_PATH: str = "static/uploads"
+    UPLOAD_THUMBNAIL_SIZE: int = 320  # Longest edge of list-view thumbnails
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024  # Larger multipart bodies get 413 while streaming
+    UPLOAD_MAX_PIXELS: int = 50_000_000  # Checked from the image header, before decoding
+    S3_BUCKET: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://localhost:9000 for MinIO
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_PUBLIC_URL: Optional[str] = None  # CDN / public base URL for stored objects
+
+    # Load and warm up models in a background thread at startup (see /ready)
+    MODEL_WARMUP: bool = False
+
+    # Inference Batching
+    INFERENCE_MAX_BATCH_SIZE: int = 8
+    INFERENCE_MAX_WAIT_MS: float = 10.0  # How long to hold a batch open for more requests
+
+    # Inference Executor (shared by leaf and root models, per worker)
+    INFERENCE_WORKERS: int = 2  # Forward passes at once; each model may use all of them
+    INFERENCE_MAX_PENDING: int = 32  # Requests beyond this get 503 + Retry-After
+    INFERENCE_RETRY_AFTER: int = 2  # Seconds
+
+    # Prediction Cache (repeat uploads of identical images); size 0 disables it
+    PREDICTION_CACHE_SIZE: int = 1024
+    PREDICTION_CACHE_DIR: Optional[str] = None  # Optional on-disk tier shared by workers
+    PREDICTION_CACHE_DISK_MAX_ENTRIES: int = 10000
+
+    # Shared Model Server (unset = each worker loads its own models)
+    MODEL_SERVER_SOCKET: Optional[str] = None
+    MODEL_SERVER_TIMEOUT: float = 30.0
     
     # CORS
     CORS_ORIGINS: list = [
@@ -60,6 +123,24 @@ class Settings(BaseSettings):
     MQTT_USE_TLS: bool = os.getenv("MQTT_USE_TLS", "true").lower() == "true"
     MQTT_TOPIC: str = "farm/soil/node01/data"
     SOIL_RAW_SCALE: float = 0.1 # Raw 800 -> 80 mg/kg
+
+    # Sensor Ingestion (bulk writes of MQTT readings)
+    SOIL_INGEST_BATCH_SIZE: int = 200
+    SOIL_INGEST_FLUSH_MS: int = 1000
+    SOIL_INGEST_MAX_PENDING: int = 10000  # Oldest readings are dropped beyond this
+
+    # Sensor Rollups & Retention (days; 0 keeps data forever)
+    SOIL_ROLLUP_ENABLED: bool = True
+    SOIL_ROLLUP_INTERVAL_SECONDS: int = 60
+    SOIL_RAW_RETENTION_DAYS: int = 0  # Opt in: deletes raw readings older than this (rollups are kept)
+    SOIL_MINUTE_RETENTION_DAYS: int = 30
+    SOIL_HOUR_RETENTION_DAYS: int = 365
+    SOIL_DAY_RETENTION_DAYS: int = 0
+    SOIL_SERIES_MAX_POINTS: int = 1000  # /api/soil/series picks the finest tier under this
+    SOIL_RECOMMEND_MAX_READINGS: int = 10000  # Newest readings scored by /api/soil/recommend
+
+    # Live Sensor Feed (/api/soil/stream)
+    SOIL_FEED_KEEPALIVE_SECONDS: int = 15
     
     model_config = SettingsConfigDict(env_file=os.path.join(BASE_DIR, ".env"), env_file_encoding="utf-8", extra="ignore")
 
@@ -1,3 +1,4 @@
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
@@ -9,10 +10,32 @@ connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else
 
 engine = create_async_engine(db_url, echo=settings.DEBUG, future=True, connect_args=connect_args)
 
+def _add_missing_columns(sync_conn):
+    # create_all never alters existing tables; add new nullable columns so older databases keep working
+    inspector = inspect(sync_conn)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            print(f"[INFO] Added column {table.name}.{column.name}")
+
+def _create_missing_indexes(sync_conn):
+    # create_all skips tables that already exist, including any indexes added to them later
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
 async def init_db():
     async with engine.begin() as conn:
         # await conn.run_sync(SQLModel.metadata.drop_all)
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
 
 async def get_session() -> AsyncSession:
     async_session = sessionmaker(
@@ -8,6 +8,7 @@ from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from database import get_session
+from services.user_cache import user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
@@ -26,10 +27,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSe
     except JWTError:
         raise credentials_exception
     
+    cached = user_cache.get(token_data.email)
+    if cached is not None:
+        # Attach a private copy to this request's session without a round trip
+        return await session.merge(cached, load=False)
+
     result = await session.execute(select(models.User).where(models.User.email == token_data.email))
     user = result.scalars().first()
     if user is None:
         raise credentials_exception
+    user_cache.set(token_data.email, user)
     return user
 
 async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
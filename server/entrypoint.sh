@@ -7,6 +7,17 @@ echo "Starting Agri-Lo Backend..."
 # If using PostgreSQL, we might want a wait-for-it script here
 # But for SQLite/General deployment, we just start.
 
+# Optionally run a single model-holding process that all workers share
+if [ -n "$MODEL_SERVER_SOCKET" ]; then
+    echo "Starting shared model server on $MODEL_SERVER_SOCKET..."
+    python model_server.py --socket "$MODEL_SERVER_SOCKET" &
+
+    for i in $(seq 1 ${MODEL_SERVER_WAIT:-120}); do
+        [ -S "$MODEL_SERVER_SOCKET" ] && break
+        sleep 1
+    done
+fi
+
 # Start Gunicorn with Uvicorn workers for production
 exec gunicorn main:app \
     --workers ${WORKERS:-4} \
@@ -1,7 +1,9 @@
+import asyncio
 import os
+import threading
 import tf_compat
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
@@ -10,7 +12,9 @@ from slowapi.errors import RateLimitExceeded
 import uvicorn
 
 from config import settings
-from database import init_db
+from database import get_session, init_db
+from dependencies import RoleChecker
+from models import UserRole
 from routers import (
     analysis,
     analytics,
@@ -20,11 +24,24 @@ from routers import (
     root_analysis,
     soil_data,
     support,
+    treatments,
     users,
 )
-from services.firebase_service import firebase_service
+from services.analytics_rollup import backfill_rollups
+from services.chat_cache import chat_cache
+from services.chat_service import chat_service
+from services.inference_executor import InferenceQueueFull, inference_executor
+from services.model_client import model_server_client
+from services.prediction_cache import prediction_cache
+from services.registry import ml_services
+from services.soil_feed import soil_feed
+from services.soil_ingest import soil_ingest
+from services.soil_latest import soil_latest
+from services.user_cache import user_cache
+from services.soil_rollup import run_maintenance as run_soil_maintenance
 from services.mqtt import mqtt_service
 from utils.limiter import limiter
+from utils.uploads import UploadSizeLimitMiddleware
 
 # ------------------ Create App ------------------
 
@@ -33,6 +50,12 @@ app = FastAPI(
     description="Backend for Agri-Lo Smart Farming App",
 )
 
+# ------------------ UPLOAD LIMITS ------------------
+
+# Added before CORS so 413 responses still carry CORS headers
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.UPLOAD_MAX_BYTES)
+
+
 # ------------------ CORS ------------------
 
 app.add_middleware(
@@ -41,6 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -68,6 +92,21 @@ async def rate_limit_handler(request: Request, exc):
     )
 
 
+# ------------------ INFERENCE BACK-PRESSURE ------------------
+
+@app.exception_handler(InferenceQueueFull)
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFull):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy analysing other images, please retry shortly"},
+        headers={
+            "Retry-After": str(exc.retry_after),
+            "Access-Control-Allow-Origin": request.headers.get("origin", "*"),
+            "Access-Control-Allow-Credentials": "true",
+        },
+    )
+
+
 # ------------------ GLOBAL ERROR HANDLER ------------------
 
 @app.exception_handler(Exception)
@@ -84,16 +123,47 @@ async def global_exception_handler(request: Request, exc):
 
 # ------------------ Startup / Shutdown ------------------
 
+def warm_up_models():
+    for name in ml_services.names:
+        try:
+            ml_services.get(name).warm_up()
+        except Exception as e:
+            print(f"[ERROR] Model warm-up failed ({name}): {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
     await init_db()
-    firebase_service.initialize()
+    async for session in get_session():
+        if await backfill_rollups(session):
+            print("[INFO] Backfilled disease_daily_rollups from existing scans")
+        break
+    soil_feed.bind(asyncio.get_running_loop())
     mqtt_service.start()
 
+    app.state.soil_rollup_task = None
+    if settings.SOIL_ROLLUP_ENABLED:
+        app.state.soil_rollup_task = asyncio.create_task(
+            run_soil_maintenance(settings.SOIL_ROLLUP_INTERVAL_SECONDS)
+        )
+
+    # With a shared model server the models live (and warm up) in that process
+    if settings.MODEL_WARMUP and model_server_client is None:
+        threading.Thread(target=warm_up_models, name="model-warmup", daemon=True).start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     mqtt_service.stop()
+    if app.state.soil_rollup_task is not None:
+        app.state.soil_rollup_task.cancel()
+    # Only services a request (or warm-up) actually imported have batchers to close
+    for service in ml_services.loaded().values():
+        batcher = getattr(service, "batcher", None)
+        if batcher is not None:
+            await batcher.close()
+    inference_executor.shutdown()
+    await chat_service.close()
 
 
 # ------------------ Static Files ------------------
@@ -112,6 +182,7 @@ app.include_router(support.router, prefix="/api/support", tags=["Support"])
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(soil_data.router, prefix="/api/soil", tags=["Soil Data"])
+app.include_router(treatments.router, prefix="/api/treatments", tags=["Treatments"])
 app.include_router(appointments.router, prefix="/api/appointments", tags=["Appointments"])
 
 
@@ -122,6 +193,45 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def ready():
+    if model_server_client is not None:
+        try:
+            models = await model_server_client.status()
+        except Exception as e:
+            return JSONResponse(
+                status_code=503,
+                content={"status": "unavailable", "detail": f"Model server unreachable: {e}"},
+            )
+        is_ready = all(m["state"] == "ready" for m in models.values())
+    else:
+        models = ml_services.load_status()
+        # Without warm-up, models load lazily on first use and the worker is always routable;
+        # the crop model is optional and never holds up readiness
+        is_ready = not settings.MODEL_WARMUP or all(models[name]["state"] == "ready" for name in ("leaf", "root"))
+
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "not_ready", "models": models},
+    )
+
+
+# Cache, queue and batcher internals are for operators only
+@app.get("/metrics", dependencies=[Depends(RoleChecker([UserRole.ADMIN.value]))])
+async def metrics():
+    return {
+        "prediction_cache": prediction_cache.stats(),
+        "leaf_batcher": ml_services.get("leaf").batcher.stats(),
+        "root_batcher": ml_services.get("root").batcher.stats(),
+        "inference_executor": inference_executor.stats(),
+        "soil_ingest": soil_ingest.stats(),
+        "soil_feed": soil_feed.stats(),
+        "soil_latest": soil_latest.stats(),
+        "user_cache": user_cache.stats(),
+        "chat_cache": chat_cache.stats(),
+    }
+
+
 @app.get("/")
 async def root():
     return {
@@ -129,6 +239,7 @@ async def root():
         "status": "ok",
         "docs": "/docs",
         "health": "/health",
+        "ready": "/ready",
     }
 
 
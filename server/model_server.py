@@ -0,0 +1,105 @@
+"""
+Out-of-process model server.
+
+Holds the only copy of the leaf and root models on a node and serves
+inference to the API workers over a Unix socket. Workers write the input
+tensor into shared memory and send a one-line JSON request naming the block;
+the server replies with the class probabilities.
+
+Run with: python model_server.py --socket /tmp/agrilo-models.sock
+"""
+import argparse
+import asyncio
+import json
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import tf_compat
+from config import settings
+from services.disease_service import disease_service
+from services.root_service import root_service
+
+
+def _read_shared_tensor(name: str, shape: list, dtype: str) -> np.ndarray:
+    shm = shared_memory.SharedMemory(name=name)
+    # The client owns (and unlinks) the block; stop our tracker from touching it at exit
+    resource_tracker.unregister(shm._name, "shared_memory")
+    try:
+        return np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf).copy()
+    finally:
+        shm.close()
+
+
+async def _predict(model: str, image: np.ndarray) -> np.ndarray:
+    if model == "leaf":
+        if disease_service.model is None:
+            raise RuntimeError("Leaf model is not loaded")
+        return await disease_service.batcher.submit(image)
+    if model == "root":
+        if root_service.model is None:
+            raise RuntimeError("Root model is not loaded")
+        return await root_service.batcher.submit(image)
+    raise ValueError(f"Unknown model: {model}")
+
+
+def _status() -> dict:
+    return {
+        "leaf": disease_service.load_status(),
+        "root": root_service.load_status(),
+    }
+
+
+async def _dispatch(request: dict) -> dict:
+    op = request.get("op")
+    if op == "predict":
+        image = _read_shared_tensor(request["shm"], request["shape"], request["dtype"])
+        predictions = await _predict(request["model"], image)
+        return {"ok": True, "predictions": np.asarray(predictions, dtype=np.float32).tolist()}
+    if op == "status":
+        return {"ok": True, "models": _status()}
+    raise ValueError(f"Unknown op: {op}")
+
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                response = await _dispatch(json.loads(line))
+            except Exception as e:
+                print(f"[ERROR] Model server request failed: {e}")
+                response = {"ok": False, "error": str(e)}
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def serve(socket_path: str):
+    disease_service.warm_up()
+    root_service.warm_up()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    server = await asyncio.start_unix_server(handle_client, path=socket_path)
+    os.chmod(socket_path, 0o660)
+    print(f"[INFO] Model server listening on {socket_path}")
+
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agri-Lo shared model server")
+    parser.add_argument(
+        "--socket",
+        default=settings.MODEL_SERVER_SOCKET or "/tmp/agrilo-models.sock",
+        help="Unix socket path to listen on",
+    )
+    args = parser.parse_args()
+    asyncio.run(serve(args.socket))
@@ -1,7 +1,7 @@
 from sqlmodel import SQLModel, Field
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, Index
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, date
 import uuid
 import enum
 
@@ -27,7 +27,7 @@ class User(SQLModel, table=True):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     name: str = Field(max_length=100)
     email: str = Field(unique=True, index=True)
-    phone: Optional[str] = Field(default=None, max_length=15)
+    phone: Optional[str] = Field(default=None, max_length=15, index=True)
     hashed_password: str
     role: str = Field(default=UserRole.FARMER.value)
     language: str = Field(default="en")
@@ -42,7 +42,7 @@ class AuthSession(SQLModel, table=True):
     __tablename__ = "auth_sessions"
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     user_id: str = Field(index=True)
-    refresh_token: str
+    refresh_token: str = Field(index=True)
     device_info: Optional[str] = None
     ip_address: Optional[str] = None
     expires_at: datetime
@@ -50,11 +50,20 @@ class AuthSession(SQLModel, table=True):
 
 class Scan(SQLModel, table=True):
     __tablename__ = "scans"
+    __table_args__ = (
+        # History / recent activity: a user's scans newest first, keyset on (created_at, id)
+        Index("ix_scans_user_created_id", "user_id", "created_at", "id"),
+        # Per-type listings for a user (soil trends, leaf stats)
+        Index("ix_scans_user_type_created", "user_id", "scan_type", "created_at"),
+        # /similar: recent scans with the same diagnosis
+        Index("ix_scans_type_disease_created", "scan_type", "disease_detected", "created_at"),
+    )
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
-    user_id: str = Field(index=True)
+    user_id: str
     scan_type: str # leaf, soil, root
     crop_name: Optional[str] = None
     image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     # Generic status/summary fields
@@ -70,6 +79,20 @@ class AnalysisResult(SQLModel, table=True):
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class DiseaseDailyRollup(SQLModel, table=True):
+    """Per-user, per-day leaf disease counts, maintained on scan insert for analytics."""
+    __tablename__ = "disease_daily_rollups"
+    user_id: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    disease: str = Field(primary_key=True)
+    count: int = Field(default=0)
+
+class DataMigration(SQLModel, table=True):
+    """One row per one-off data backfill that has been applied to this database."""
+    __tablename__ = "data_migrations"
+    name: str = Field(primary_key=True)
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
+
 class ExpertQuery(SQLModel, table=True):
     __tablename__ = "expert_queries"
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
@@ -86,8 +109,12 @@ class ExpertQuery(SQLModel, table=True):
 
 class ChatHistory(SQLModel, table=True):
     __tablename__ = "chat_history"
+    __table_args__ = (
+        # History pages and chat context: a user's messages newest first, keyset on (created_at, id)
+        Index("ix_chat_history_user_created_id", "user_id", "created_at", "id"),
+    )
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
-    user_id: str = Field(index=True)
+    user_id: str
     role: str # "user" or "bot"
     message: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -103,6 +130,10 @@ class SupportTicket(SQLModel, table=True):
 
 class SoilData(SQLModel, table=True):
     __tablename__ = "soil_data"
+    __table_args__ = (
+        Index("ix_soil_data_timestamp", "timestamp"),
+        Index("ix_soil_data_node_timestamp", "node_id", "timestamp"),
+    )
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     node_id: str
@@ -114,6 +145,35 @@ class SoilData(SQLModel, table=True):
     temperature: float
     ec: float
 
+class SoilRollup(SQLModel, table=True):
+    """Per-node sensor aggregates at 1m/1h/1d resolution (mean = sum / samples), see services/soil_rollup.py."""
+    __tablename__ = "soil_rollups"
+    resolution: str = Field(primary_key=True)  # "1m" | "1h" | "1d"
+    node_id: str = Field(primary_key=True)
+    bucket: datetime = Field(primary_key=True)  # Bucket start (UTC)
+    samples: int = Field(default=0)
+    nitrogen_min: float
+    nitrogen_max: float
+    nitrogen_sum: float
+    phosphorus_min: float
+    phosphorus_max: float
+    phosphorus_sum: float
+    potassium_min: float
+    potassium_max: float
+    potassium_sum: float
+    ph_min: float
+    ph_max: float
+    ph_sum: float
+    moisture_min: float
+    moisture_max: float
+    moisture_sum: float
+    temperature_min: float
+    temperature_max: float
+    temperature_sum: float
+    ec_min: float
+    ec_max: float
+    ec_sum: float
+
 class Appointment(SQLModel, table=True):
     __tablename__ = "appointments"
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
@@ -1,20 +1,23 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Request, Response
 from pydantic import BaseModel
 import asyncio
 from typing import List, Optional
 import os
-import joblib
 import uuid
 
 import models
 from schemas import soil as soil_schemas
 from services.soil_service import soil_service
-from services.disease_service import disease_service
+from services.registry import ml_services
+from services.analytics_rollup import record_scan
+from services.storage import image_store
 from dependencies import get_current_user
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, col
 from database import get_session
 from utils.limiter import limiter
+from utils.pagination import encode_cursor, older_than
+from utils.uploads import read_image_upload
 
 router = APIRouter()
 
@@ -83,6 +86,28 @@ async def analyze_soil(
     }
 
 
+@router.post("/soil/recommend", response_model=soil_schemas.SoilResponse)
+@limiter.limit("30/minute")
+async def recommend_crops(
+    request: Request,
+    data: soil_schemas.SoilDataInput,
+    top_k: int = Query(3, ge=1, le=10),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Top-k crops for a soil reading from the trained crop model."""
+    if not await asyncio.to_thread(soil_service.ensure_crop_model):
+        raise HTTPException(status_code=503, detail="Crop recommendation model is not available")
+
+    recommendations = await asyncio.to_thread(soil_service.recommend_crops, [data], top_k)
+    return {
+        "status": "success",
+        "data": {
+            "recommendations": recommendations[0],
+            "input_data": data.dict()
+        }
+    }
+
+
 @router.post("/detect", response_model=DiseaseResponse)
 @limiter.limit("5/minute")
 async def detect_disease(
@@ -91,22 +116,11 @@ async def detect_disease(
     current_user: models.User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
-    # 1. Read and Save File
-    contents = await file.read()
-    
-    # Save image
-    filename = f"{uuid.uuid4()}.jpg"
-    file_path = f"static/uploads/{filename}"
-    # Ensure dir exists
-    os.makedirs("static/uploads", exist_ok=True)
-    
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    image_url = f"{request.base_url}static/uploads/{filename}"
-    
-    # 2. Predict
-    disease_name, confidence, treatment_info = await disease_service.predict_disease(contents)
+    # 1. Validate from the header
+    upload = await read_image_upload(file)
+
+    # 2. Predict before storing anything: a 503 from a saturated worker (or a model error) leaves no files behind
+    disease_name, confidence, treatment_info = await ml_services.get("leaf").predict_disease(upload.file)
     
     if not disease_name:
          return {
@@ -114,17 +128,24 @@ async def detect_disease(
             "data": {"disease": "Model error", "confidence": 0, "severity": "Unknown", "treatment": []}
         }
 
-    # 3. Save to DB (Scan + AnalysisResult)
+    # 3. Save original + thumbnail straight from the spooled upload
+    image_url, thumbnail_url = await image_store.save_upload(
+        upload.file, str(request.base_url), upload.extension, upload.content_type
+    )
+
+    # 4. Save to DB (Scan + AnalysisResult)
     try:
         new_scan = models.Scan(
             user_id=current_user.id,
             scan_type="leaf",
             crop_name="Unknown", # Model doesn't predict crop name unless we have multi-class
             image_url=image_url,
+            thumbnail_url=thumbnail_url,
             disease_detected=disease_name,
             confidence=confidence
         )
         session.add(new_scan)
+        await record_scan(session, new_scan)
         await session.commit()
         await session.refresh(new_scan)
         
@@ -145,24 +166,46 @@ async def detect_disease(
             "severity": treatment_info.get('severity', 'Unknown'),
             "treatment": treatment_info,
             "report_id": new_scan.id if 'new_scan' in locals() else None,
-            "image_url": image_url
+            "image_url": image_url,
+            "thumbnail_url": thumbnail_url
         }
     }
 
 @router.get("/history")
 async def get_analysis_history(
-    limit: int = 10,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
-    # Fetch Scans (Leaf, Soil, Root)
+    # Fetch Scans (Leaf, Soil, Root), newest first, keyset-paginated on (created_at, id)
     statement = select(models.Scan).where(
         col(models.Scan.user_id) == current_user.id
-    ).order_by(models.Scan.created_at.desc()).limit(limit)
+    )
+    if cursor:
+        statement = statement.where(older_than(cursor, col(models.Scan.created_at), col(models.Scan.id)))
+    statement = statement.order_by(
+        col(models.Scan.created_at).desc(), col(models.Scan.id).desc()
+    ).limit(limit + 1)
     
     result = await session.execute(statement)
     scans = result.scalars().all()
 
+    # One extra row tells us whether another page exists
+    if len(scans) > limit:
+        scans = scans[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(scans[-1].created_at, scans[-1].id)
+
+    # Load extra data for all leaf scans in one IN query instead of one query per scan
+    leaf_ids = [scan.id for scan in scans if scan.scan_type == "leaf"]
+    leaf_results = {}
+    if leaf_ids:
+        res_stmt = select(models.AnalysisResult).where(col(models.AnalysisResult.scan_id).in_(leaf_ids))
+        res_result = await session.execute(res_stmt)
+        for analysis_res in res_result.scalars().all():
+            leaf_results.setdefault(analysis_res.scan_id, analysis_res)
+
     history = []
     
     for scan in scans:
@@ -181,10 +224,7 @@ async def get_analysis_history(
             item["status"] = "Healthy" if "healthy" in (scan.disease_detected or "").lower() else "Issue Detected"
             item["image"] = scan.image_url or "https://source.unsplash.com/random/200x200?leaf"
             
-            # Load extra data manually
-            res_stmt = select(models.AnalysisResult).where(models.AnalysisResult.scan_id == scan.id)
-            res_result = await session.execute(res_stmt)
-            analysis_res = res_result.scalars().first()
+            analysis_res = leaf_results.get(scan.id)
             
             if analysis_res:
                 res_data = analysis_res.result_data 
@@ -204,6 +244,8 @@ async def get_analysis_history(
             item["status"] = "Healthy" if "healthy" in (scan.disease_detected or "").lower() else "Issue Detected"
             item["image"] = scan.image_url or "https://source.unsplash.com/random/200x200?roots"
             
+        # Small pre-generated image for list views; the original stays in "image"
+        item["thumbnail"] = scan.thumbnail_url or item["image"]
         history.append(item)
         
     return history
@@ -229,6 +271,7 @@ async def get_similar_cases(
             "disease": s.disease_detected,
             "location": "Nearby", # Mock location
             "image": s.image_url or "https://source.unsplash.com/random/200x200?farm",
+            "thumbnail": s.thumbnail_url or s.image_url or "https://source.unsplash.com/random/200x200?farm",
             "date": s.created_at
         })
     
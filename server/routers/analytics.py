@@ -1,12 +1,13 @@
+import asyncio
+
 from fastapi import APIRouter, Depends
 from dependencies import get_current_user
 import models
-from collections import Counter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, col, func
 from database import get_session
-from services.soil_service import soil_service
-from schemas.soil import SoilDataInput
+from services.soil_service import STATUS_NAMES, soil_service
+from services.analytics_rollup import disease_counts
 
 router = APIRouter()
 
@@ -25,29 +26,35 @@ async def get_analytics_summary(
 
     soil_trends = []
     current_problems = []
+    recommended_crops = None
     soil_status = "Excellent"
     
     if hw_data:
-        # Get latest for problem detection
-        latest_record = hw_data[0]
-        soil_status, _, current_problems = soil_service.analyze_health(SoilDataInput(
-            nitrogen=latest_record.nitrogen,
-            phosphorus=latest_record.phosphorus,
-            potassium=latest_record.potassium,
-            ph=latest_record.ph,
-            moisture=latest_record.moisture,
-            temperature=latest_record.temperature,
-            rainfall=100 # Default/Mock
-        ))
+        # Score the whole window at once; messages only for the latest reading
+        scores = soil_service.score_health(
+            [r.ph for r in hw_data],
+            [r.moisture for r in hw_data],
+            [r.nitrogen for r in hw_data],
+            [r.phosphorus for r in hw_data],
+            [r.potassium for r in hw_data],
+        )
+        soil_status = STATUS_NAMES[scores.status[0]]
+        current_problems = soil_service.problem_messages(int(scores.problems[0]))
+
+        # Whole window in one predict_proba call
+        if await asyncio.to_thread(soil_service.ensure_crop_model):
+            recommended_crops = await asyncio.to_thread(soil_service.recommend_crops_for_window, hw_data, 3)
 
-        # Use hardware data for trends
-        for record in reversed(hw_data):
+        # Use hardware data for trends (oldest first)
+        for i in range(len(hw_data) - 1, -1, -1):
+            record = hw_data[i]
             soil_trends.append({
                 "date": record.timestamp.isoformat() + "Z",
                 "nitrogen": record.nitrogen,
                 "phosphorus": record.phosphorus,
                 "potassium": record.potassium,
-                "ph": record.ph
+                "ph": record.ph,
+                "health_score": int(scores.score[i])
             })
     else:
         # Fallback to manual scans if no hardware data
@@ -58,11 +65,19 @@ async def get_analytics_summary(
         
         result_soil = await session.execute(stmt_soil)
         recent_soil_scans = result_soil.scalars().all()
+
+        # One IN query for all result rows instead of one lookup per scan
+        results_by_scan = {}
+        if recent_soil_scans:
+            stmt_res = select(models.AnalysisResult).where(
+                col(models.AnalysisResult.scan_id).in_([scan.id for scan in recent_soil_scans])
+            )
+            result_res = await session.execute(stmt_res)
+            for result_obj in result_res.scalars().all():
+                results_by_scan.setdefault(result_obj.scan_id, result_obj)
         
         for scan in reversed(recent_soil_scans):
-            stmt_res = select(models.AnalysisResult).where(models.AnalysisResult.scan_id == scan.id)
-            result_res = await session.execute(stmt_res)
-            result_obj = result_res.scalars().first()
+            result_obj = results_by_scan.get(scan.id)
             
             if result_obj and result_obj.result_data:
                 data = result_obj.result_data
@@ -74,18 +89,8 @@ async def get_analytics_summary(
                     "ph": data.get("ph", 0)
                 })
 
-    # 2. Disease Stats (Frequency from Leaf Scans)
-    stmt_leaf = select(models.Scan).where(
-        models.Scan.user_id == current_user.id,
-        models.Scan.scan_type == "leaf"
-    )
-    result_leaf = await session.execute(stmt_leaf)
-    leaf_scans = result_leaf.scalars().all()
-    
-    diseases = [s.disease_detected for s in leaf_scans if s.disease_detected]
-    disease_counts = Counter(diseases)
-    
-    disease_stats = [{"name": name, "count": count} for name, count in disease_counts.items()]
+    # 2. Disease Stats (Frequency from Leaf Scans, pre-aggregated per day)
+    disease_stats = await disease_counts(session, current_user.id)
 
     # 3. Recent Activity (Combine Soil and Disease)
     # Fetch recent mixed scans
@@ -106,7 +111,7 @@ async def get_analytics_summary(
                 "result": "Analyzed", 
                 "confidence": "-",
                 "status": "Info",
-                "image": s.image_url
+                "image": s.thumbnail_url or s.image_url
             })
         elif s.scan_type == "leaf":
             status = "Warning"
@@ -120,7 +125,7 @@ async def get_analytics_summary(
                 "result": s.disease_detected,
                 "confidence": f"{int(s.confidence)}%" if s.confidence else "-",
                 "status": status,
-                "image": s.image_url
+                "image": s.thumbnail_url or s.image_url
             })
         elif s.scan_type == "root":
              activity.append({
@@ -130,13 +135,14 @@ async def get_analytics_summary(
                 "result": s.disease_detected,
                 "confidence": "-",
                 "status": "Warning" if s.disease_detected else "Info",
-                "image": s.image_url
+                "image": s.thumbnail_url or s.image_url
             })
     
     return {
         "soil_trends": soil_trends,
         "soil_status": soil_status,
         "soil_problems": current_problems,
+        "recommended_crops": recommended_crops,
         "disease_stats": disease_stats,
         "recent_activity": activity
     }
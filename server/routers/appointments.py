@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
-import razorpay
+from functools import lru_cache
 from config import settings
 from models import Appointment, User, AppointmentStatus
 from datetime import datetime
@@ -12,8 +12,11 @@ from database import get_session
 
 router = APIRouter()
 
-# Initialize Razorpay Client
-client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+@lru_cache(maxsize=1)
+def get_razorpay_client():
+    # Created on the first payment call: the SDK is only needed by these routes
+    import razorpay
+    return razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
 
 class OrderCreate(BaseModel):
     amount: float = 199.00
@@ -36,7 +39,7 @@ async def create_order(
 ):
     try:
         data = { "amount": int(order.amount * 100), "currency": order.currency, "receipt": str(uuid.uuid4()) }
-        payment_order = client.order.create(data=data)
+        payment_order = get_razorpay_client().order.create(data=data)
         return payment_order
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -47,6 +50,8 @@ async def verify_payment(
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
+    from razorpay.errors import SignatureVerificationError
+
     try:
         # Verify signature
         params_dict = {
@@ -54,7 +59,7 @@ async def verify_payment(
             'razorpay_payment_id': payment.razorpay_payment_id,
             'razorpay_signature': payment.razorpay_signature
         }
-        client.utility.verify_payment_signature(params_dict)
+        get_razorpay_client().utility.verify_payment_signature(params_dict)
         
         # Create Appointment
         details = payment.appointment_details
@@ -75,7 +80,7 @@ async def verify_payment(
         
         return {"status": "success", "appointment_id": new_appointment.id}
         
-    except razorpay.errors.SignatureVerificationError:
+    except SignatureVerificationError:
         raise HTTPException(status_code=400, detail="Payment verification failed")
     except Exception as e:
         print(f"Payment Error: {e}")
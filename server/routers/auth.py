@@ -13,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from database import get_session
 from utils.limiter import limiter
+from services.user_cache import user_cache
 
 router = APIRouter()
 
@@ -57,7 +58,7 @@ async def register(
         if existing_phone:
             raise HTTPException(status_code=400, detail="Phone number already registered")
 
-    hashed_password = utils.get_password_hash(user.password)
+    hashed_password = await utils.get_password_hash_async(user.password)
     new_user = models.User(
         email=email,
         hashed_password=hashed_password,
@@ -123,12 +124,21 @@ async def login(
         
     user = result.scalars().first()
     
-    if not user or not utils.verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await utils.verify_password_async(form_data.password, user.hashed_password)
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    if new_hash:
+        # Stored hash used older argon2 parameters; saved with the auth session below
+        user.hashed_password = new_hash
+        session.add(user)
     
     access_token = utils.create_access_token(subject=user.email)
     
@@ -202,12 +212,8 @@ async def refresh_token(
     }
 
 from services.firebase_service import firebase_service
-from firebase_admin import auth as firebase_auth
 from pydantic import BaseModel
 
-# Ensure Firebase is initialized
-firebase_service.initialize()
-
 class FirebaseLoginRequest(BaseModel):
     idToken: str
 
@@ -222,7 +228,7 @@ async def firebase_login(
     try:
         # Verify the ID token sent by the frontend
         # check_revoked=True is safer but requires more API calls
-        decoded_token = firebase_auth.verify_id_token(request_data.idToken)
+        decoded_token = firebase_service.verify_id_token(request_data.idToken)
         
         uid = decoded_token['uid']
         phone_number = decoded_token.get('phone_number')
@@ -303,6 +309,7 @@ async def logout(
         if auth_session:
             await session.delete(auth_session)
             await session.commit()
+            user_cache.invalidate_user_id(auth_session.user_id)
     
     response.delete_cookie("refresh_token")
     return {"message": "Logged out successfully"}
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 from services.chat_service import chat_service
 from dependencies import get_current_user
@@ -8,6 +12,7 @@ import models
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, col
 from database import get_session
+from utils.pagination import encode_cursor, older_than
 
 router = APIRouter()
 
@@ -19,47 +24,95 @@ class ChatResponse(BaseModel):
     reply: str
     language: str
 
+class ChatMessageOut(BaseModel):
+    id: str
+    role: str
+    message: str
+    created_at: datetime
+
+async def _save_exchange(session: AsyncSession, user_id, message: str, reply: str):
+    session.add(models.ChatHistory(user_id=user_id, role="user", message=message))
+    session.add(models.ChatHistory(user_id=user_id, role="bot", message=reply))
+    await session.commit()
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @router.post("/message", response_model=ChatResponse)
 async def chat_message(
     request: ChatRequest,
+    http_request: Request,
     current_user: models.User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
-    # 1. Get Response from AI
-    reply = await chat_service.get_response(request.message, language=request.language)
-    
-    # 2. Save User Message
-    user_msg = models.ChatHistory(
-        user_id=current_user.id,
-        role="user",
-        message=request.message
-    )
-    session.add(user_msg)
-    
-    # 3. Save Bot Response
-    bot_msg = models.ChatHistory(
-        user_id=current_user.id,
-        role="bot",
-        message=reply
-    )
-    session.add(bot_msg)
-    
-    await session.commit()
-    
+    """
+    Reply to a chat message. Clients sending `Accept: text/event-stream` get
+    the reply token by token as `delta` events, then a final `done` event.
+    """
+    history = await chat_service.load_context(session, current_user.id)
+
+    if "text/event-stream" in http_request.headers.get("accept", ""):
+        user_id = current_user.id
+
+        async def events():
+            parts = []
+            async for delta in chat_service.stream_response(request.message, history, language=request.language):
+                parts.append(delta)
+                yield _sse("delta", {"text": delta})
+            reply = "".join(parts)
+
+            # Saved once the reply is complete; the request's session is already closed while streaming
+            async for stream_session in get_session():
+                await _save_exchange(stream_session, user_id, request.message, reply)
+                break
+            yield _sse("done", {"reply": reply, "language": request.language})
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    reply = await chat_service.get_response(request.message, history, language=request.language)
+    await _save_exchange(session, current_user.id, request.message, reply)
+
     return {
         "reply": reply,
         "language": request.language
     }
 
-@router.get("/history")
+@router.get("/history", response_model=List[ChatMessageOut])
 async def get_chat_history(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
-    statement = select(models.ChatHistory).where(
-        models.ChatHistory.user_id == current_user.id
-    ).order_by(models.ChatHistory.created_at.asc())
-    
+    """
+    One window of the user's chat, newest first. When older messages exist
+    the X-Next-Cursor header holds the cursor for the next window.
+    """
+    statement = select(
+        models.ChatHistory.id, models.ChatHistory.role, models.ChatHistory.message, models.ChatHistory.created_at
+    ).where(
+        col(models.ChatHistory.user_id) == current_user.id
+    )
+    if cursor:
+        statement = statement.where(older_than(cursor, col(models.ChatHistory.created_at), col(models.ChatHistory.id)))
+    statement = statement.order_by(
+        col(models.ChatHistory.created_at).desc(), col(models.ChatHistory.id).desc()
+    ).limit(limit + 1)
+
     result = await session.execute(statement)
-    history = result.scalars().all()
-    return history
+    rows = result.all()
+
+    # One extra row tells us whether another window exists
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return [
+        {"id": row.id, "role": row.role, "message": row.message, "created_at": row.created_at}
+        for row in rows
+    ]
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request
 from typing import List, Optional
 from pydantic import BaseModel
-import os
-import uuid
 
 import models
 from dependencies import get_current_user
-from services.root_service import root_service
+from services.registry import ml_services
+from services.storage import image_store
+from utils.uploads import read_image_upload
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_session
 
@@ -19,23 +19,19 @@ class RootResponse(BaseModel):
 
 @router.post("/analyze", response_model=RootResponse)
 async def analyze_root(
+    request: Request,
     file: UploadFile = File(...),
     current_user: models.User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
-    contents = await file.read()
-    
-     # Save image
-    filename = f"{uuid.uuid4()}.jpg"
-    file_path = f"static/uploads/{filename}"
-    os.makedirs("static/uploads", exist_ok=True)
-    
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    image_url = f"http://localhost:5000/{file_path}"
-    
-    diagnosis, recommendation = await root_service.predict_root_disease(contents)
+    # Validate from the header, then predict before storing anything so a 503 leaves no files behind
+    upload = await read_image_upload(file)
+    diagnosis, recommendation = await ml_services.get("root").predict_root_disease(upload.file)
+
+    # Save original + thumbnail straight from the spooled upload
+    image_url, thumbnail_url = await image_store.save_upload(
+        upload.file, str(request.base_url), upload.extension, upload.content_type
+    )
 
     # Save to DB (Scan)
     try:
@@ -43,6 +39,7 @@ async def analyze_root(
             user_id=current_user.id,
             scan_type="root",
             image_url=image_url,
+            thumbnail_url=thumbnail_url,
             disease_detected=diagnosis,
             confidence=100.0 if diagnosis else 0.0 # Heuristic
         )
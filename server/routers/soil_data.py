@@ -1,31 +1,57 @@
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from models import SoilData
-from typing import List
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, col
+from sqlmodel import select
+from config import settings
 from database import get_session
+from services.soil_feed import soil_feed
+from services.soil_latest import soil_latest
+from services.soil_service import PROBLEM_FLAGS, STATUS_NAMES, soil_service
+from services.soil_rollup import RESOLUTIONS, TIERS, soil_series
 
 router = APIRouter()
 
 @router.get("/latest", response_model=SoilData)
-async def get_latest_soil_data(session: AsyncSession = Depends(get_session)):
-    # Filter for non-zero NPK to avoid showing sensor errors
-    statement = select(SoilData).where(
-        (col(SoilData.nitrogen) > 0) | (col(SoilData.phosphorus) > 0) | (col(SoilData.potassium) > 0)
-    ).order_by(SoilData.timestamp.desc()).limit(1)
-    
-    result = await session.execute(statement)
-    result_obj = result.scalars().first()
-    
-    if result_obj:
-        print(f"[DEBUG] Fetching latest soil data: {result_obj.nitrogen}, {result_obj.phosphorus}, {result_obj.potassium}")
-    else:
+async def get_latest_soil_data(
+    node_id: Optional[str] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    # Served from the in-memory map kept by MQTT ingestion; the DB is only hit on a cold start
+    reading = await soil_latest.latest(session, node_id)
+
+    if not reading:
         print("[DEBUG] No soil data found in DB")
-    
-    if not result_obj:
         raise HTTPException(status_code=404, detail="No sensor data found")
-    
-    return result_obj
+
+    return reading
+
+@router.get("/stream")
+async def stream_soil_data(request: Request, node_id: Optional[str] = None):
+    """Server-Sent Events feed of live readings (all nodes, or one with ?node_id=)."""
+    async def events():
+        with soil_feed.subscribe(node_id) as subscription:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    readings = await subscription.next(settings.SOIL_FEED_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                for reading in readings:
+                    data = {**reading, "timestamp": reading["timestamp"].isoformat() + "Z"}
+                    yield f"event: reading\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/history", response_model=List[SoilData])
 async def get_soil_history(
@@ -35,3 +61,98 @@ async def get_soil_history(
     statement = select(SoilData).order_by(SoilData.timestamp.desc()).limit(limit)
     result = await session.execute(statement)
     return result.scalars().all()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+@router.get("/series")
+async def get_soil_series(
+    node_id: str,
+    resolution: Optional[str] = Query(None, description="raw, 1m, 1h or 1d; picked from the range when omitted"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    session: AsyncSession = Depends(get_session)
+):
+    end = _as_utc(end) if end else datetime.utcnow()
+    start = _as_utc(start) if start else end - timedelta(days=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+
+    if resolution is not None:
+        if resolution not in RESOLUTIONS:
+            raise HTTPException(status_code=400, detail=f"resolution must be one of {', '.join(RESOLUTIONS)}")
+        if resolution in TIERS and (end - start) / TIERS[resolution][0] > settings.SOIL_SERIES_MAX_POINTS:
+            raise HTTPException(status_code=400, detail="Range too large for this resolution")
+
+    return await soil_series(session, node_id, start, end, resolution)
+
+@router.get("/health")
+async def get_soil_health_series(
+    node_id: str,
+    crop: str = "generic",
+    resolution: Optional[str] = Query(None, description="raw, 1m, 1h or 1d; picked from the range when omitted"),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Soil health over time for trend charts, scored in one pass over the same
+    points as /series (bucket means for rollups). Each point carries a status
+    code and a problem bitmask; `statuses` and `problems` decode them.
+    """
+    series = await get_soil_series(node_id, resolution, start, end, session)
+    points = series.pop("points")
+    scores = soil_service.score_health(
+        *([point[metric]["mean"] for point in points] for metric in ("ph", "moisture", "nitrogen", "phosphorus", "potassium")),
+        crop=crop,
+    )
+    return {
+        **series,
+        "crop": crop,
+        "statuses": STATUS_NAMES,
+        "problems": {flag: soil_service.problem_messages(flag, crop)[0] for flag in PROBLEM_FLAGS},
+        "points": [
+            {"timestamp": point["timestamp"], "score": int(score), "status": int(status), "problems": int(problems)}
+            for point, score, status, problems in zip(points, scores.score, scores.status, scores.problems)
+        ],
+    }
+
+@router.get("/recommend")
+async def recommend_crops_for_node(
+    node_id: str,
+    hours: float = Query(24, gt=0, le=24 * 7),
+    top_k: int = Query(3, ge=1, le=10),
+    session: AsyncSession = Depends(get_session)
+):
+    """Top-k crops for a node's readings over the last `hours`, scored as one batch."""
+    if not await asyncio.to_thread(soil_service.ensure_crop_model):
+        raise HTTPException(status_code=503, detail="Crop recommendation model is not available")
+
+    end = datetime.utcnow()
+    start = end - timedelta(hours=hours)
+    statement = select(
+        SoilData.nitrogen, SoilData.phosphorus, SoilData.potassium,
+        SoilData.temperature, SoilData.moisture, SoilData.ph,
+    ).where(
+        SoilData.node_id == node_id,
+        SoilData.timestamp >= start,
+        # All-zero NPK means the sensor wasn't reading
+        (SoilData.nitrogen > 0) | (SoilData.phosphorus > 0) | (SoilData.potassium > 0),
+    ).order_by(SoilData.timestamp.desc()).limit(settings.SOIL_RECOMMEND_MAX_READINGS)
+    result = await session.execute(statement)
+    readings = result.all()
+    if not readings:
+        raise HTTPException(status_code=404, detail="No sensor readings in this window")
+
+    recommendations = await asyncio.to_thread(soil_service.recommend_crops_for_window, readings, top_k)
+    return {
+        "node_id": node_id,
+        "from": start.isoformat() + "Z",
+        "to": end.isoformat() + "Z",
+        "readings": len(readings),
+        "recommendations": recommendations,
+    }
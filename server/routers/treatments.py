@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from typing import Optional
+from services.treatment_service import treatment_service
+
+router = APIRouter()
+
+@router.get("/{disease}")
+async def get_treatment(
+    disease: str,
+    request: Request,
+    response: Response,
+    lang: Optional[str] = None,
+):
+    kb = treatment_service.knowledge_base
+    entry = kb.lookup(disease, lang)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No treatment found for this disease")
+
+    # Same data file + same language => same body, so the client can revalidate cheaply
+    etag = f'"{kb.etag}-{lang or kb.default_language}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return {"disease": disease, "version": kb.version, **entry}
@@ -7,6 +7,7 @@ from dependencies import get_current_active_user
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_session
+from services.user_cache import user_cache
 
 router = APIRouter()
 
@@ -34,5 +35,6 @@ async def update_user_me(
     session.add(current_user)
     await session.commit()
     await session.refresh(current_user)
+    user_cache.invalidate(current_user.email)
     
     return current_user
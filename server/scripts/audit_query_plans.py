@@ -0,0 +1,133 @@
+"""
+Query plan audit for the API's hot read paths.
+
+Seeds a throwaway SQLite database, calls each read endpoint through the real
+routers with a real access token, captures every SELECT they issue and runs
+EXPLAIN QUERY PLAN on it. Exits with status 1 if any query falls back to a
+full table scan, so it can run in CI:
+
+    python scripts/audit_query_plans.py
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="agrilo-audit-"), "audit.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+# Add server directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import models
+from database import engine, get_session, init_db
+from main import app
+from utils.auth import create_access_token, get_password_hash
+
+# Endpoints to audit: (method, path, kwargs)
+ENDPOINTS = [
+    ("get", "/api/analysis/history", {"params": {"limit": 10}}),
+    ("get", "/api/analysis/similar", {"params": {"disease": "Tomato___Early_blight"}}),
+    ("get", "/api/analytics/summary", {}),
+    ("get", "/api/soil/latest", {}),
+    ("get", "/api/soil/latest", {"params": {"node_id": "node02"}}),
+    ("get", "/api/soil/history", {}),
+    ("get", "/api/soil/series", {"params": {"node_id": "node01"}}),
+    ("get", "/api/soil/series", {"params": {"node_id": "node01", "resolution": "1h"}}),
+    ("get", "/api/chat/history", {}),
+    ("get", "/api/auth/me", {}),
+    ("post", "/api/auth/login", {"data": {"username": "audit@example.com", "password": "audit"}}),
+    ("post", "/api/auth/login", {"data": {"username": "+910000000000", "password": "audit"}}),
+    ("post", "/api/auth/refresh", {"cookies": {"refresh_token": "missing"}}),
+]
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+captured = []
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def capture_select(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT"):
+        captured.append((statement, parameters))
+
+
+async def seed():
+    await init_db()
+    async for session in get_session():
+        user = models.User(
+            id="audit-user",
+            name="Audit",
+            email="audit@example.com",
+            phone="+910000000000",
+            hashed_password=get_password_hash("audit"),
+        )
+        session.add(user)
+
+        now = datetime.utcnow()
+        for i in range(30):
+            scan_type = ("leaf", "soil", "root")[i % 3]
+            scan = models.Scan(
+                user_id=user.id,
+                scan_type=scan_type,
+                disease_detected="Tomato___Early_blight" if scan_type == "leaf" else "Good",
+                created_at=now - timedelta(hours=i),
+            )
+            session.add(scan)
+            session.add(models.AnalysisResult(scan_id=scan.id, result_data={"nitrogen": 40}))
+
+        for i in range(30):
+            session.add(models.SoilData(
+                node_id="node01",
+                nitrogen=40, phosphorus=20, potassium=30,
+                ph=6.5, moisture=40.0, temperature=25.0, ec=1.0,
+                timestamp=now - timedelta(minutes=i),
+            ))
+        await session.commit()
+        break
+    await engine.dispose()
+
+
+def explain(statement: str, parameters) -> list:
+    with sqlite3.connect(DB_PATH) as conn:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    return [row[-1] for row in rows]
+
+
+def main():
+    asyncio.run(seed())
+
+    # Only the queries matter here; some handlers need a real client address and may 500 afterwards
+    client = TestClient(app, raise_server_exceptions=False)
+    token = create_access_token(subject="audit@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    failures = 0
+    for method, path, kwargs in ENDPOINTS:
+        captured.clear()
+        response = getattr(client, method)(path, headers=headers, **kwargs)
+        print(f"\n{method.upper()} {path} -> {response.status_code}")
+
+        for statement, parameters in captured:
+            plan = explain(statement, parameters)
+            scans = [step for step in plan if FULL_SCAN.match(step)]
+            label = "FULL SCAN" if scans else "ok"
+            print(f"  [{label}] {' | '.join(plan)}")
+            print(f"      {' '.join(statement.split())[:160]}")
+            failures += len(scans)
+
+    if failures:
+        print(f"\n[FAIL] {failures} full table scan(s) found")
+        sys.exit(1)
+    print("\n[OK] All audited queries use an index")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Chat response cache report.
+
+Replays a set of farmer questions (repeats, rephrasings, and look-alikes
+about a different crop, or negated, that must NOT share an answer) through
+ChatService and prints the cache hit ratio and the LLM latency it saved.
+Needs a completions endpoint; the local stub is enough (the same pairs
+without an LLM: scripts/check_chat_cache.py):
+
+    python scripts/stub_chat_server.py --port 8900 &
+    GROQ_API_KEY=stub GROQ_BASE_URL=http://127.0.0.1:8900 python scripts/benchmark_chat_cache.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Add server directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.chat_cache import chat_cache
+from services.chat_service import chat_service
+
+# (question, language, should_hit)
+QUESTIONS = [
+    ("How to treat tomato early blight?", "en", False),
+    ("how to treat tomato early blight", "en", True),
+    ("How do I treat early blight in tomato?", "en", True),
+    ("How to treat potato early blight?", "en", False),
+    ("How to treat tomato late blight?", "en", False),
+    ("What is the best fertilizer for corn?", "en", False),
+    ("best fertilizer for corn", "en", True),
+    ("Best fertilizer for wheat", "en", False),
+    ("How much water does wheat need?", "en", False),
+    ("how much water do wheat need", "en", True),
+    ("How much water does rice need?", "en", False),
+    ("Should I spray fungicide on tomato?", "en", False),
+    ("Should I not spray fungicide on tomato?", "en", False),
+    ("Shouldn't I spray fungicide on tomato?", "en", True),
+    ("How to treat tomato early blight?", "hi", False),
+    ("How to treat tomato early blight?", "hi", True),
+]
+
+
+async def main():
+    if not chat_service.api_key:
+        print("Set GROQ_API_KEY (and GROQ_BASE_URL for the local stub) first.")
+        return
+
+    wrong = 0
+    for question, language, should_hit in QUESTIONS:
+        before = chat_cache.stats()
+        started = time.perf_counter()
+        await chat_service.get_response(question, language=language)
+        elapsed = time.perf_counter() - started
+        after = chat_cache.stats()
+
+        hit = after["exact_hits"] + after["semantic_hits"] > before["exact_hits"] + before["semantic_hits"]
+        wrong += hit != should_hit
+        status = "hit " if hit else "miss"
+        flag = "" if hit == should_hit else "   <-- unexpected"
+        print(f"{status} {elapsed * 1000:>8.1f} ms  [{language}] {question}{flag}")
+
+    await chat_service.close()
+
+    stats = chat_cache.stats()
+    print(f"\nhit rate {stats['hit_rate']:.0%} ({stats['exact_hits']} exact, {stats['semantic_hits']} similar, "
+          f"{stats['misses']} misses), LLM latency saved {stats['latency_saved_seconds']:.2f}s, "
+          f"unexpected outcomes {wrong}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
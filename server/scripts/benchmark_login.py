@@ -0,0 +1,111 @@
+"""
+Login throughput benchmark for a single worker.
+
+Drives /api/auth/login in-process (no network) with concurrent clients
+against a throwaway SQLite database, while a probe measures how long the
+event loop stalls. Runs twice: once with argon2 called inline on the loop
+(the old behaviour) and once on the hashing pool from utils/auth.py.
+
+    python scripts/benchmark_login.py --logins 40 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="agrilo-bench-"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+# Add server directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+import models
+from database import get_session, init_db
+from main import app
+from utils import auth
+from utils.limiter import limiter
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+
+async def _verify_inline(plain_password, hashed_password):
+    return auth.pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def seed():
+    await init_db()
+    async for session in get_session():
+        session.add(models.User(name="Bench", email=EMAIL, hashed_password=auth.get_password_hash(PASSWORD)))
+        await session.commit()
+        break
+
+
+async def probe_loop(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Worst observed event loop stall in seconds."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(logins: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login():
+            nonlocal failures
+            async with semaphore:
+                response = await client.post("/api/auth/login", data={"username": EMAIL, "password": PASSWORD})
+                if response.status_code != 200:
+                    failures += 1
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_loop(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        stall = await probe
+
+    return {
+        "logins_per_sec": round(logins / elapsed, 2),
+        "max_loop_stall_ms": round(stall * 1000, 1),
+        "failures": failures,
+    }
+
+
+async def main(logins: int, concurrency: int):
+    await seed()
+    limiter.enabled = False  # Login is rate limited per client address
+
+    pooled = auth.verify_password_async
+    results = {}
+    for mode, verify in (("inline", _verify_inline), ("pool", pooled)):
+        auth.verify_password_async = verify
+        results[mode] = await run(logins, concurrency)
+    auth.verify_password_async = pooled
+
+    print(f"argon2: t={auth.settings.ARGON2_TIME_COST} m={auth.settings.ARGON2_MEMORY_COST}KiB "
+          f"p={auth.settings.ARGON2_PARALLELISM}, hash workers={auth.settings.PASSWORD_HASH_WORKERS}")
+    print(f"{logins} logins, {concurrency} concurrent\n")
+    for mode, result in results.items():
+        print(f"{mode:>7}: {result['logins_per_sec']:>7} logins/s   "
+              f"max loop stall {result['max_loop_stall_ms']:>7} ms   failures {result['failures']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark login throughput per worker")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
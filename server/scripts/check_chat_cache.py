@@ -0,0 +1,62 @@
+"""
+Chat response cache regression check.
+
+Runs question pairs straight through ChatResponseCache (no LLM needed) and
+fails (exit code 1) if a rephrasing misses or if a question is served the
+cached answer to a different one: another crop, disease or language, or
+its own negation. Run it after changing the normalization, stop words or
+CHAT_CACHE_SIMILARITY:
+
+    python scripts/check_chat_cache.py
+"""
+import os
+import sys
+
+# Add server directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from services.chat_cache import ChatResponseCache, embed_question, normalize_question
+
+# (cached question, asked question, language of the asked one, should_hit)
+PAIRS = [
+    ("How to treat tomato early blight?", "how to treat tomato early blight", "en", True),
+    ("How to treat tomato early blight?", "How do I treat early blight in tomato?", "en", True),
+    ("What is the best fertilizer for corn?", "best fertilizer for corn", "en", True),
+    ("Don't water wheat after rain?", "Do not water wheat after rain?", "en", True),
+    ("How to treat tomato early blight?", "How to treat potato early blight?", "en", False),
+    ("How to treat tomato early blight?", "How to treat tomato late blight?", "en", False),
+    ("How to treat tomato early blight?", "How to treat tomato early blight?", "hi", False),
+    # Negations: nearly the same vector, opposite answer
+    ("Should I spray fungicide on tomato?", "Should I not spray fungicide on tomato?", "en", False),
+    ("Should I spray fungicide on tomato?", "Shouldn't I spray fungicide on tomato?", "en", False),
+    ("Should I spray fungicide on tomato?", "Should I never spray fungicide on tomato?", "en", False),
+    ("Can I grow rice in sandy soil?", "Can't I grow rice in sandy soil?", "en", False),
+    ("Can I grow rice in sandy soil?", "Can I grow rice without sandy soil?", "en", False),
+    ("Is urea safe for wheat seedlings?", "Is no urea safe for wheat seedlings?", "en", False),
+    ("Do I water maize after sowing?", "Don't I water maize after sowing?", "en", False),
+]
+
+
+def main() -> int:
+    wrong = 0
+    for cached, asked, language, should_hit in PAIRS:
+        cache = ChatResponseCache(max_entries=8, similarity=settings.CHAT_CACHE_SIMILARITY)
+        cache.set(cached, "en", "reply", latency=1.0)
+        hit = cache.get(asked, language) is not None
+
+        similarity = float(embed_question(normalize_question(cached), cache.dim)
+                           @ embed_question(normalize_question(asked), cache.dim))
+        flag = "" if hit == should_hit else "   <-- unexpected"
+        wrong += hit != should_hit
+        print(f"{'hit ' if hit else 'miss'} {similarity:.3f}  [{language}] {cached!r} -> {asked!r}{flag}")
+
+    if wrong:
+        print(f"\nFAILED: {wrong} unexpected outcomes")
+        return 1
+    print(f"\nOK: {len(PAIRS)} pairs as expected at similarity {settings.CHAT_CACHE_SIMILARITY}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
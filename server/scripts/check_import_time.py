@@ -0,0 +1,99 @@
+"""
+Import-time regression check for API workers.
+
+Imports `main` in a fresh interpreter under `python -X importtime` and fails
+(exit code 1) if any heavy ML or optional SDK package is imported at module
+load, showing which import chain pulled it in, or if the total import time
+exceeds the budget. Run it in CI or before merging changes to imports:
+
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --budget-ms 1500 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only be imported on first use (model load, payment, phone login, chat)
+DEFERRED_PACKAGES = (
+    "tensorflow", "keras", "tf_keras", "h5py", "onnxruntime",
+    "sklearn", "scipy", "joblib",
+    "firebase_admin", "razorpay", "groq",
+)
+
+
+def measure(module: str):
+    env = dict(os.environ)
+    # Importing main builds the DB engine; keep it off any real database
+    env.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'agrilo-importtime.db')}")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVER_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"Importing {module} failed")
+
+    # "import time: self [us] | cumulative | imported package", children listed before their parent
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = line.replace("import time:", "|", 1).split("|")
+        # One leading space, then two per nesting level
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def import_chain(entries, index: int):
+    """Names from the top-level import down to entries[index]."""
+    chain = [entries[index][0]]
+    depth = entries[index][3]
+    for name, _, _, entry_depth in entries[index + 1:]:
+        if entry_depth < depth:
+            chain.append(name)
+            depth = entry_depth
+    return " > ".join(reversed(chain))
+
+
+def main(module: str, budget_ms: float, top: int) -> int:
+    entries = measure(module)
+    total_ms = next(cumulative for name, _, cumulative, depth in entries if name == module and depth == 0) / 1000
+
+    failures = []
+    for index, (name, _, cumulative, _) in enumerate(entries):
+        if name in DEFERRED_PACKAGES:
+            failures.append(f"{name} imported at startup ({cumulative / 1000:.0f} ms): {import_chain(entries, index)}")
+    if total_ms > budget_ms:
+        failures.append(f"import {module} took {total_ms:.0f} ms, budget is {budget_ms:.0f} ms")
+
+    print(f"import {module}: {total_ms:.0f} ms (budget {budget_ms:.0f} ms)\n")
+    print("Slowest top-level packages:")
+    packages = {}
+    for name, _, cumulative, depth in entries:
+        if "." not in name and name != module:
+            packages[name] = max(packages.get(name, 0), cumulative)
+    for name, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nOK: no deferred ML/SDK packages imported at startup")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check API worker import time")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=2500.0,
+                        help="Total import budget; generous because -X importtime adds its own overhead")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(main(args.module, args.budget_ms, args.top))
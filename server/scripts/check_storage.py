@@ -0,0 +1,178 @@
+"""
+Upload storage check.
+
+Saves a generated photo through ImageStore on each storage backend and
+verifies what was written: the original bytes, a JPEG thumbnail that fits
+UPLOAD_THUMBNAIL_SIZE, content types, cache headers and public URLs. Exits
+with status 1 on any mismatch, so it can run in CI:
+
+    python scripts/check_storage.py
+
+S3Storage runs against an in-memory stub client, and also against moto's
+mocked S3 when boto3 and moto are installed.
+"""
+import asyncio
+import io
+import os
+import sys
+import tempfile
+
+# Add server directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from config import settings
+from services.storage import ImageStore, LocalStorage, S3Storage, StorageBackend
+
+BASE_URL = "http://testserver/"
+BUCKET = "agrilo-check"
+
+
+class StubS3Client:
+    """Records upload_fileobj calls the way S3 would store them."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None):
+        self.objects[(bucket, key)] = (fileobj.read(), dict(ExtraArgs or {}))
+
+    def get(self, key):
+        return self.objects[(BUCKET, key)]
+
+
+class MotoS3Client:
+    """Real boto3 client against moto's in-process S3, read back with get_object."""
+
+    def __init__(self, client):
+        self.client = client
+        self.upload_fileobj = client.upload_fileobj
+
+    def get(self, key):
+        response = self.client.get_object(Bucket=BUCKET, Key=key)
+        return response["Body"].read(), {
+            "ContentType": response["ContentType"],
+            "CacheControl": response.get("CacheControl"),
+        }
+
+
+def sample_photo() -> bytes:
+    img = Image.new("RGB", (1600, 1200))
+    for x in range(0, 1600, 100):
+        img.paste((x % 256, 120, 255 - x % 256), (x, 0, x + 100, 1200))
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+def check_upload(label: str, image_url: str, thumbnail_url: str, url_prefix: str, read, photo: bytes) -> list:
+    """`read(key)` returns (bytes, metadata or None) for a stored key."""
+    failures = []
+    for url in (image_url, thumbnail_url):
+        if not url or not url.startswith(url_prefix):
+            failures.append(f"{label}: URL {url!r} does not start with {url_prefix!r}")
+            return failures
+
+    original, metadata = read(image_url[len(url_prefix):])
+    if original != photo:
+        failures.append(f"{label}: stored original differs from the upload")
+    if metadata is not None and metadata.get("ContentType") != "image/jpeg":
+        failures.append(f"{label}: original has content type {metadata.get('ContentType')!r}")
+
+    thumbnail, metadata = read(thumbnail_url[len(url_prefix):])
+    with Image.open(io.BytesIO(thumbnail)) as img:
+        if img.format != "JPEG" or max(img.size) > settings.UPLOAD_THUMBNAIL_SIZE:
+            failures.append(f"{label}: thumbnail is {img.format} {img.size}")
+    if metadata is not None:
+        if metadata.get("ContentType") != "image/jpeg":
+            failures.append(f"{label}: thumbnail has content type {metadata.get('ContentType')!r}")
+        if "immutable" not in (metadata.get("CacheControl") or ""):
+            failures.append(f"{label}: thumbnail is missing the immutable Cache-Control")
+
+    print(f"[{'FAIL' if failures else 'ok'}] {label}: {image_url} (+ thumbnail {len(thumbnail)} bytes)")
+    return failures
+
+
+async def check_backend(label: str, backend: StorageBackend, url_prefix: str, read, photo: bytes) -> list:
+    store = ImageStore(backend, thumbnail_size=settings.UPLOAD_THUMBNAIL_SIZE)
+    failures = []
+    # Uploads arrive as spooled files; bytes must work too
+    for source in (io.BytesIO(photo), photo):
+        image_url, thumbnail_url = await store.save_upload(source, BASE_URL)
+        failures += check_upload(f"{label} ({type(source).__name__})", image_url, thumbnail_url, url_prefix, read, photo)
+    return failures
+
+
+def check_s3_urls() -> list:
+    cases = [
+        ({"public_url": "https://cdn.example.com/"}, "https://cdn.example.com/a.jpg"),
+        ({"endpoint_url": "http://localhost:9000/"}, f"http://localhost:9000/{BUCKET}/a.jpg"),
+        ({}, f"https://{BUCKET}.s3.amazonaws.com/a.jpg"),
+    ]
+    failures = []
+    for kwargs, expected in cases:
+        url = S3Storage(BUCKET, client=StubS3Client(), **kwargs).url("a.jpg", BASE_URL)
+        if url != expected:
+            failures.append(f"S3Storage({kwargs}).url() gave {url!r}, expected {expected!r}")
+    print(f"[{'FAIL' if failures else 'ok'}] S3Storage public URL variants")
+    return failures
+
+
+def check_incomplete_backend() -> list:
+    class NoUrl(StorageBackend):
+        async def save(self, key, source, content_type):
+            pass
+
+    try:
+        NoUrl()
+    except TypeError:
+        print("[ok] Incomplete StorageBackend subclass rejected at construction")
+        return []
+    return ["A StorageBackend without url() could be constructed"]
+
+
+async def run_checks() -> list:
+    photo = sample_photo()
+    failures = check_incomplete_backend() + check_s3_urls()
+
+    with tempfile.TemporaryDirectory(prefix="agrilo-storage-") as root:
+        def read_local(key):
+            with open(os.path.join(root, key), "rb") as f:
+                return f.read(), None
+
+        local = LocalStorage(root, "static/uploads")
+        failures += await check_backend("local", local, f"{BASE_URL}static/uploads/", read_local, photo)
+
+    stub = StubS3Client()
+    s3 = S3Storage(BUCKET, public_url="https://cdn.example.com", client=stub)
+    failures += await check_backend("s3 stub", s3, "https://cdn.example.com/", stub.get, photo)
+
+    try:
+        import boto3
+        from moto import mock_aws
+    except ImportError:
+        print("[skip] s3 moto: boto3 and moto are not installed")
+        return failures
+
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        moto = MotoS3Client(client)
+        s3 = S3Storage(BUCKET, client=client)
+        failures += await check_backend("s3 moto", s3, f"https://{BUCKET}.s3.amazonaws.com/", moto.get, photo)
+    return failures
+
+
+def main():
+    failures = asyncio.run(run_checks())
+    if failures:
+        print(f"\n[FAIL] {len(failures)} problem(s)")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n[OK] Storage backends store originals, thumbnails and URLs as expected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Export the leaf / root Keras models to TFLite or ONNX and check accuracy parity.
+
+Examples (run from the server directory):
+    python scripts/export_models.py --model all --format tflite --quantize float16
+    python scripts/export_models.py --model leaf --format tflite --quantize int8
+    python scripts/export_models.py --model root --format onnx --quantize int8
+    python scripts/export_models.py --model leaf --format onnx --parity-only
+
+The parity check runs the Keras model and the exported artifact over the same
+sample images and fails (exit code 1) if top-1 agreement drops below
+--min-agreement. Serve the result with INFERENCE_BACKEND=tflite|onnx.
+"""
+import argparse
+import glob
+import os
+import sys
+
+# Add server directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import tf_compat
+import tensorflow as tf
+from config import BASE_DIR
+from services.disease_service import disease_service
+from services.root_service import root_service
+from utils.image_preprocessing import load_image, normalize_into
+from utils.inference_backends import load_backend
+
+MODELS = {
+    "leaf": {"service": disease_service, "size": 256},
+    "root": {"service": root_service, "size": 224},
+}
+
+
+def load_samples(sample_dir: str, size: int, limit: int) -> np.ndarray:
+    paths = sorted(
+        p for ext in ("*.jpg", "*.jpeg", "*.png")
+        for p in glob.glob(os.path.join(sample_dir, ext))
+    )[:limit]
+    if not paths:
+        raise SystemExit(f"No sample images found in {sample_dir}")
+
+    images = [load_image(path, size) for path in paths]
+    return normalize_into(images, np.empty((len(images), size, size, 3), dtype=np.float32))
+
+
+def export_tflite(keras_model, output_path: str, quantize: str, samples: np.ndarray):
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+
+    if quantize == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == "int8":
+        # Full integer quantization calibrated on the sample images; I/O stays float32
+        def representative_dataset():
+            for image in samples:
+                yield [image[np.newaxis]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [
+            tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+            tf.lite.OpsSet.TFLITE_BUILTINS,
+        ]
+
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+
+
+def export_onnx(keras_model, output_path: str, quantize: str, size: int):
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None, size, size, 3), tf.float32, name="input"),)
+    fp32_path = output_path if quantize == "none" else output_path + ".fp32"
+    tf2onnx.convert.from_keras(keras_model, input_signature=spec, opset=13, output_path=fp32_path)
+
+    if quantize == "int8":
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(fp32_path, output_path, weight_type=QuantType.QInt8)
+    elif quantize == "float16":
+        import onnx
+        from onnxconverter_common import float16
+
+        model = float16.convert_float_to_float16(onnx.load(fp32_path), keep_io_types=True)
+        onnx.save(model, output_path)
+
+    if fp32_path != output_path:
+        os.remove(fp32_path)
+
+
+def check_parity(keras_model, exported_path: str, fmt: str, samples: np.ndarray, min_agreement: float) -> bool:
+    backend = load_backend(fmt, exported_path)
+    reference = np.asarray(keras_model.predict(samples, verbose=0))
+    candidate = np.concatenate([backend.predict(samples[i:i + 8]) for i in range(0, len(samples), 8)])
+
+    agreement = float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1)))
+    max_diff = float(np.max(np.abs(reference - candidate)))
+    size_mb = os.path.getsize(exported_path) / (1024 * 1024)
+
+    print(f"[PARITY] {os.path.basename(exported_path)}: {len(samples)} samples, "
+          f"top-1 agreement {agreement:.2%}, max |dp| {max_diff:.4f}, size {size_mb:.1f} MB")
+    return agreement >= min_agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Agri-Lo models for CPU inference")
+    parser.add_argument("--model", choices=["leaf", "root", "all"], default="all")
+    parser.add_argument("--format", choices=["tflite", "onnx"], default="tflite")
+    parser.add_argument("--quantize", choices=["none", "float16", "int8"], default="float16")
+    parser.add_argument("--samples", default=os.path.join(BASE_DIR, "static/uploads"),
+                        help="Directory of images used for int8 calibration and the parity check")
+    parser.add_argument("--num-samples", type=int, default=64)
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    parser.add_argument("--parity-only", action="store_true",
+                        help="Skip export and only compare an existing artifact against Keras")
+    args = parser.parse_args()
+
+    names = ["leaf", "root"] if args.model == "all" else [args.model]
+    ok = True
+
+    for name in names:
+        service = MODELS[name]["service"]
+        size = MODELS[name]["size"]
+        output_path = service.EXPORTED_MODEL_PATHS[args.format]
+
+        print(f"[INFO] Loading Keras {name} model...")
+        keras_model = service._load_keras_model()
+        samples = load_samples(args.samples, size, args.num_samples)
+
+        if not args.parity_only:
+            print(f"[INFO] Exporting {name} model to {output_path} ({args.quantize})...")
+            if args.format == "tflite":
+                export_tflite(keras_model, output_path, args.quantize, samples)
+            else:
+                export_onnx(keras_model, output_path, args.quantize, size)
+
+        ok = check_parity(keras_model, output_path, args.format, samples, args.min_agreement) and ok
+
+    if not ok:
+        print(f"[FAIL] Exported model agreement below {args.min_agreement:.0%}; keep INFERENCE_BACKEND=keras")
+        sys.exit(1)
+    print(f"[OK] Parity check passed; set INFERENCE_BACKEND={args.format} to serve the exported models")
+
+
+if __name__ == "__main__":
+    main()
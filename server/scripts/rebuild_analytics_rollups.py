@@ -0,0 +1,22 @@
+import asyncio
+import os
+import sys
+
+# Add server directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_session, init_db
+from services.analytics_rollup import rebuild_all
+
+async def rebuild_rollups():
+    print("Initializing database schema...")
+    await init_db()
+
+    # Startup backfills once per database; this recomputes everything, e.g. after editing scans by hand
+    async for session in get_session():
+        await rebuild_all(session)
+        print("Successfully rebuilt disease_daily_rollups from scans")
+        break
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_rollups())
@@ -0,0 +1,84 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+Answers POST /openai/v1/chat/completions like the real service (JSON, or
+SSE chunks when "stream": true), echoing the user's message back word by
+word with a small delay per token. Point the server at it to work on chat
+without an API key or network access:
+
+    python scripts/stub_chat_server.py --port 8900
+    GROQ_API_KEY=stub GROQ_BASE_URL=http://127.0.0.1:8900 uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="Stub Chat Completions")
+TOKEN_DELAY = 0.05
+
+
+def _reply_tokens(body: dict) -> list:
+    user_messages = [m["content"] for m in body.get("messages", []) if m.get("role") == "user"]
+    text = f"Stub reply to: {user_messages[-1] if user_messages else ''}"
+    words = text.split(" ")
+    return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "stub")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    tokens = _reply_tokens(body)
+
+    if not body.get("stream"):
+        await asyncio.sleep(TOKEN_DELAY * len(tokens))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+        }
+
+    async def events():
+        yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+        for token in tokens:
+            await asyncio.sleep(TOKEN_DELAY)
+            yield _chunk(completion_id, model, {"content": token})
+        yield _chunk(completion_id, model, {}, finish_reason="stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Groq chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--token-delay", type=float, default=TOKEN_DELAY, help="Seconds between streamed tokens")
+    args = parser.parse_args()
+    TOKEN_DELAY = args.token_delay
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,121 @@
+from sqlalchemy import delete, insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, func, select
+
+import models
+
+_UPSERTS = {
+    "sqlite": sqlite_insert,
+    "postgresql": pg_insert,
+}
+
+BACKFILL_NAME = "disease_daily_rollups"
+
+
+async def record_scan(session: AsyncSession, scan: models.Scan):
+    """
+    Bump the disease rollup for a newly added leaf scan.
+
+    Runs in the caller's transaction, so the rollup commits (or rolls back)
+    together with the scan itself.
+    """
+    if scan.scan_type != "leaf" or not scan.disease_detected:
+        return
+
+    rollup = models.DiseaseDailyRollup
+    values = {
+        "user_id": scan.user_id,
+        "day": scan.created_at.date(),
+        "disease": scan.disease_detected,
+        "count": 1,
+    }
+
+    upsert = _UPSERTS.get(session.bind.dialect.name)
+    if upsert is None:
+        # Portable fallback for dialects without ON CONFLICT support
+        existing = await session.get(rollup, (values["user_id"], values["day"], values["disease"]))
+        if existing:
+            existing.count += 1
+        else:
+            session.add(rollup(**values))
+        return
+
+    statement = upsert(rollup).values(**values).on_conflict_do_update(
+        index_elements=["user_id", "day", "disease"],
+        set_={"count": rollup.count + 1},
+    )
+    await session.execute(statement)
+
+
+async def disease_counts(session: AsyncSession, user_id: str) -> list:
+    """Disease frequency for a user, served from the rollup (backfilled from scans at startup)."""
+    rollup = models.DiseaseDailyRollup
+    total = func.sum(rollup.count).label("total")
+    result = await session.execute(
+        select(rollup.disease, total)
+        .where(rollup.user_id == user_id)
+        .group_by(rollup.disease)
+        .order_by(total.desc())
+    )
+    return [{"name": name, "count": int(count)} for name, count in result.all()]
+
+
+async def _rebuild(session: AsyncSession):
+    """
+    Replace every rollup row with counts from the scans table, in the caller's transaction.
+
+    Concurrent record_scan() calls must wait for the rebuild to commit, or a scan
+    counted by both (or by neither) would skew the totals. On PostgreSQL that is
+    an explicit table lock; SQLite takes its database write lock on the first
+    write, so callers must write before this reads the scans.
+    """
+    scan = models.Scan
+    rollup = models.DiseaseDailyRollup
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(text(f"LOCK TABLE {rollup.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+    await session.execute(delete(rollup))
+    await session.execute(
+        insert(rollup).from_select(
+            ["user_id", "day", "disease", "count"],
+            select(scan.user_id, func.date(scan.created_at), scan.disease_detected, func.count())
+            .where(
+                scan.scan_type == "leaf",
+                col(scan.disease_detected).is_not(None),
+                scan.disease_detected != "",
+            )
+            .group_by(scan.user_id, func.date(scan.created_at), scan.disease_detected),
+        )
+    )
+
+
+async def rebuild_all(session: AsyncSession):
+    """Recompute every rollup row from the scans table in one transaction."""
+    await _rebuild(session)
+    await session.commit()
+
+
+async def backfill_rollups(session: AsyncSession) -> bool:
+    """
+    Build the rollups from existing scans once per database.
+
+    The data_migrations marker is written first and committed together with
+    the rebuilt rows, so a crash leaves neither behind and the next startup
+    retries, while workers starting side by side run it only once (the
+    loser's marker insert conflicts). Returns True if this call backfilled.
+    """
+    if await session.get(models.DataMigration, BACKFILL_NAME) is not None:
+        return False
+
+    try:
+        session.add(models.DataMigration(name=BACKFILL_NAME))
+        await session.flush()
+        await _rebuild(session)
+        await session.commit()
+    except IntegrityError:
+        # Another worker claimed the backfill first
+        await session.rollback()
+        return False
+    return True
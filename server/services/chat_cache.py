@@ -0,0 +1,215 @@
+import re
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from config import settings
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+_IRREGULAR_NEGATIONS = re.compile(r"\b(?:(can)not|(ca)n['’]t|(wo)n['’]t|(sha)n['’]t)\b")
+_NEGATION_SUFFIX = re.compile(r"n['’]t\b")
+
+# English filler left out of the vectors so "how do I ..." and "what is the ..." phrasings line up
+STOP_WORDS = frozenset(
+    "a an the is are am be do does did i my me we our you your how what which when where why "
+    "can could should would will to of in on for with and or it this that there please tell about much many".split()
+)
+
+# Words that point back into the conversation ("how often should I spray it?")
+REFERENCE_WORDS = frozenset("it its this that these those they them their same above".split())
+MIN_CONTENT_WORDS = 2
+
+# A question and its negation look nearly identical as vectors, so these must match exactly for a hit
+NEGATION_WORDS = frozenset("not no never without nor neither none nothing".split())
+
+
+def _expand_negation(match: re.Match) -> str:
+    stem = next(group for group in match.groups() if group)
+    return {"ca": "can", "wo": "will", "sha": "shall"}.get(stem, stem) + " not"
+
+
+def normalize_question(text: str) -> str:
+    """Case, punctuation and spacing folded away: "How to treat Early-Blight?" -> "how to treat early blight"."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    # "don't" and "can't" -> "do not" and "can not", so negations survive punctuation stripping
+    text = _IRREGULAR_NEGATIONS.sub(_expand_negation, text)
+    text = _NEGATION_SUFFIX.sub(" not", text)
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def is_standalone(question: str) -> bool:
+    """Heuristic: the question makes sense without the preceding conversation."""
+    words = normalize_question(question).split(" ")
+    if any(word in REFERENCE_WORDS for word in words):
+        return False
+    return sum(1 for word in words if word and word not in STOP_WORDS) >= MIN_CONTENT_WORDS
+
+
+def negations(normalized: str) -> Tuple[str, ...]:
+    """The negation words in a normalized question, sorted; part of the cache key."""
+    return tuple(sorted(word for word in normalized.split(" ") if word in NEGATION_WORDS))
+
+
+def embed_question(normalized: str, dim: int) -> np.ndarray:
+    """
+    Unit-length hashed feature vector over the content words: character
+    trigrams plus whole words, weighted higher so that a changed crop or
+    disease name moves the vector more than a rephrasing does.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in normalized.split(" "):
+        if not word or word in STOP_WORDS:
+            continue
+        vector[zlib.crc32(f"w:{word}".encode("utf-8")) % dim] += 2.0
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@dataclass
+class _Entry:
+    slot: int
+    reply: str
+    expires_at: float
+    latency: float  # Seconds the LLM took to produce this reply
+
+
+class ChatResponseCache:
+    """
+    Replies to previously asked questions, per language.
+
+    Lookups try the normalized question text first, then the most similar
+    cached question (cosine similarity of hashed n-gram vectors, computed
+    in one matrix-vector product) if it clears `similarity` and has the same
+    negation words, so "should I not spray ..." never gets the answer to
+    "should I spray ...". Entries expire after `ttl` seconds and the least
+    recently used is evicted when full. Each hit adds the original LLM
+    latency to `latency_saved_seconds`.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 86400.0, similarity: float = 0.9, dim: int = 1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.dim = dim
+
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        # One row per slot; a free slot is all zeros so it can never clear the threshold
+        self._vectors = np.zeros((max(max_entries, 0), dim), dtype=np.float32)
+        self._slot_keys: list = [None] * max(max_entries, 0)
+        # Slots are only compared within one (language, negation words) partition
+        self._slot_partition = np.full(max(max_entries, 0), -1, dtype=np.int32)
+        self._partition_ids: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        self._free_slots = list(range(max(max_entries, 0) - 1, -1, -1))
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.latency_saved = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def _partition(self, normalized: str, language: str) -> Tuple[str, Tuple[str, ...]]:
+        return language, negations(normalized)
+
+    def _drop(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key)
+        self._vectors[entry.slot] = 0.0
+        self._slot_keys[entry.slot] = None
+        self._slot_partition[entry.slot] = -1
+        self._free_slots.append(entry.slot)
+
+    def _hit(self, key: Tuple[str, str], entry: _Entry) -> str:
+        self._entries.move_to_end(key)
+        self.latency_saved += entry.latency
+        return entry.reply
+
+    def _nearest(self, normalized: str, language: str) -> Optional[Tuple[str, str]]:
+        partition_id = self._partition_ids.get(self._partition(normalized, language))
+        if partition_id is None:
+            return None
+        scores = self._vectors @ embed_question(normalized, self.dim)
+        scores[self._slot_partition != partition_id] = -1.0
+        slot = int(np.argmax(scores))
+        if scores[slot] < self.similarity:
+            return None
+        return self._slot_keys[slot]
+
+    def get(self, question: str, language: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        normalized = normalize_question(question)
+        key = (language, normalized)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self.exact_hits += 1
+                return self._hit(key, entry)
+            self._drop(key)
+
+        similar_key = self._nearest(normalized, language)
+        if similar_key is not None:
+            entry = self._entries[similar_key]
+            if entry.expires_at > now:
+                self.semantic_hits += 1
+                return self._hit(similar_key, entry)
+            self._drop(similar_key)
+
+        self.misses += 1
+        return None
+
+    def set(self, question: str, language: str, reply: str, latency: float):
+        if not self.enabled:
+            return
+
+        normalized = normalize_question(question)
+        if not normalized:
+            return
+        key = (language, normalized)
+        if key in self._entries:
+            self._drop(key)
+        while not self._free_slots:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+        slot = self._free_slots.pop()
+        self._vectors[slot] = embed_question(normalized, self.dim)
+        self._slot_keys[slot] = key
+        partition = self._partition(normalized, language)
+        self._slot_partition[slot] = self._partition_ids.setdefault(partition, len(self._partition_ids))
+        self._entries[key] = _Entry(slot, reply, time.monotonic() + self.ttl, latency)
+
+    def stats(self) -> dict:
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+        }
+
+
+chat_cache = ChatResponseCache(
+    max_entries=settings.CHAT_CACHE_SIZE,
+    ttl=settings.CHAT_CACHE_TTL_SECONDS,
+    similarity=settings.CHAT_CACHE_SIMILARITY,
+)
@@ -1,52 +1,145 @@
-import os
-from groq import Groq
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select, col
+
+import models
 from config import settings
-from typing import List
+from services.chat_cache import chat_cache, is_standalone
+from typing import AsyncIterator, List, Optional
+
+UNAVAILABLE_REPLY = "AI Service Unavailable. Please configure API Key."
+ERROR_REPLY = "Sorry, I am having trouble connecting to the AI expert right now."
+MODEL_ROLES = {"user": "user", "bot": "assistant"}
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English; close enough for a budget
+    return len(text) // 4 + 1
+
 
 class ChatService:
     def __init__(self):
         self.api_key = settings.GROQ_API_KEY
-        if self.api_key:
-            self.client = Groq(api_key=self.api_key)
-            self.model = "llama-3.1-8b-instant"
-        else:
+        self.model = "llama-3.1-8b-instant"
+        # Built on first use so workers that never chat don't import the Groq SDK
+        self.http_client = None
+        self._client = None
+        if not self.api_key:
             print("⚠️ GROQ_API_KEY not found. Chat will not work.")
-            self.client = None
 
-    async def get_response(self, message: str, history: List[dict] = [], language: str = "en"):
-        if not self.client:
-            return "AI Service Unavailable. Please configure API Key."
+    @property
+    def client(self):
+        if self._client is None and self.api_key:
+            import httpx
+            from groq import AsyncGroq
+
+            # One pooled HTTP client per worker: keep-alive connections are reused across requests
+            self.http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.CHAT_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.CHAT_MAX_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(settings.CHAT_TIMEOUT_SECONDS, connect=5.0),
+            )
+            self._client = AsyncGroq(
+                api_key=self.api_key,
+                base_url=settings.GROQ_BASE_URL,
+                http_client=self.http_client,
+            )
+        return self._client
+
+    def _build_messages(self, message: str, history: Optional[List[dict]], language: str) -> List[dict]:
+        # Construct System Prompt
+        system_prompt = f"""
+        You are 'Agri-Lo', an expert agricultural assistant for Indian farmers.
+        Answer in {language} language effectively.
+        Keep answers short (max 3-4 sentences unless detailed step-by-step is asked).
+        Use simple, clear language. Avoid technical jargon.
+        If the user asks about crop diseases, ask for an image if not provided context.
+        Be friendly and encouraging.
+        """
 
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend(history or [])
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    async def load_context(self, session: AsyncSession, user_id: str, max_turns: Optional[int] = None,
+                           max_tokens: Optional[int] = None) -> List[dict]:
+        """
+        The user's most recent exchanges as model messages, oldest first.
+
+        Reads at most `max_turns` user/bot pairs (newest first, off the
+        (user_id, created_at) index) and keeps the newest messages that fit
+        in `max_tokens`, so long-time users don't send their whole history.
+        """
+        max_turns = settings.CHAT_CONTEXT_TURNS if max_turns is None else max_turns
+        max_tokens = settings.CHAT_CONTEXT_TOKENS if max_tokens is None else max_tokens
+        if max_turns <= 0 or max_tokens <= 0:
+            return []
+
+        statement = select(models.ChatHistory.role, models.ChatHistory.message).where(
+            col(models.ChatHistory.user_id) == user_id
+        ).order_by(
+            col(models.ChatHistory.created_at).desc(), col(models.ChatHistory.id).desc()
+        ).limit(max_turns * 2)
+        result = await session.execute(statement)
+
+        context = []
+        budget = max_tokens
+        for role, text in result.all():
+            budget -= estimate_tokens(text)
+            if budget < 0:
+                break
+            context.append({"role": MODEL_ROLES.get(role, "user"), "content": text})
+        context.reverse()
+        return context
+
+    async def stream_response(self, message: str, history: Optional[List[dict]] = None, language: str = "en") -> AsyncIterator[str]:
+        """Yield the reply as it is generated; on failure yields a fallback message instead of raising."""
+        if not self.api_key:
+            yield UNAVAILABLE_REPLY
+            return
+
+        # A follow-up ("what about rice?") depends on the conversation, so only self-contained questions share replies
+        use_cache = not history or is_standalone(message)
+        cached = chat_cache.get(message, language) if use_cache else None
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        started = time.perf_counter()
         try:
-            # Construct System Prompt
-            system_prompt = f"""
-            You are 'Agri-Lo', an expert agricultural assistant for Indian farmers. 
-            Answer in {language} language effectively.
-            Keep answers short (max 3-4 sentences unless detailed step-by-step is asked).
-            Use simple, clear language. Avoid technical jargon.
-            If the user asks about crop diseases, ask for an image if not provided context.
-            Be friendly and encouraging.
-            """
-            
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            # Append history (simple) - for now just current message as we are stateless here mostly
-            # In a real app we'd map history properly
-            messages.append({"role": "user", "content": message})
-            
-            completion = self.client.chat.completions.create(
+            stream = await self.client.chat.completions.create(
                 model=self.model,
-                messages=messages,
+                messages=self._build_messages(message, history, language),
                 temperature=0.7,
                 max_tokens=1024,
                 top_p=1,
                 stop=None,
-                stream=False
+                stream=True
             )
-            
-            return completion.choices[0].message.content
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
         except Exception as e:
             print(f"Groq Error: {e}")
-            return "Sorry, I am having trouble connecting to the AI expert right now."
+            if not parts:
+                yield ERROR_REPLY
+        else:
+            # Only complete replies are cached, never fallbacks or streams cut short
+            if parts and use_cache:
+                chat_cache.set(message, language, "".join(parts), time.perf_counter() - started)
+
+    async def get_response(self, message: str, history: Optional[List[dict]] = None, language: str = "en") -> str:
+        return "".join([delta async for delta in self.stream_response(message, history, language)])
+
+    async def close(self):
+        if self.http_client is not None:
+            await self.http_client.aclose()
 
 chat_service = ChatService()
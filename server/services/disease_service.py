@@ -1,45 +1,102 @@
 import os
-import io
 import json
 import numpy as np
 import asyncio
-from PIL import Image
-import tf_compat
-import tensorflow as tf
+import threading
+import time
+from typing import BinaryIO, Union
 from config import settings
 from services.treatment_service import treatment_service
-from utils.model_loader import load_model_with_compat
-from utils.model_factory import build_leaf_model
+from services.inference_batcher import InferenceBatcher
+from services.inference_executor import InferenceQueueFull, inference_executor
+from services.model_client import model_server_client
+from services.prediction_cache import file_fingerprint, prediction_cache
+from utils.inference_backends import KerasBackend, load_backend
+from utils.image_preprocessing import load_image
 
 class DiseaseService:
+    EXPORTED_MODEL_PATHS = {
+        "tflite": settings.LEAF_TFLITE_PATH,
+        "onnx": settings.LEAF_ONNX_PATH,
+    }
+
     def __init__(self):
         self.model = None
         self.class_indices = {}
         # Model is NOT loaded here to allow fast startup
+        self.load_state = "cold"
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self._load_lock = threading.Lock()
+        self._model_version = None
+        self.batcher = InferenceBatcher(
+            "leaf",
+            self._predict_batch,
+            input_shape=(256, 256, 3),
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+            executor=inference_executor,
+            max_in_flight=settings.INFERENCE_WORKERS,
+        )
+
+    def _load_class_indices(self):
+        if self.class_indices:
+            return
+
+        if os.path.exists(settings.CLASS_INDICES_PATH):
+            with open(settings.CLASS_INDICES_PATH, 'r') as f:
+                data = json.load(f)
+                self.class_indices = {int(v): k for k, v in data.items()}
+            print("[INFO] Class indices loaded")
 
     def _load_model(self):
         if self.model is not None:
              return
 
+        with self._load_lock:
+            if self.model is not None:
+                return
+
+            self.load_state = "loading"
+            started = time.perf_counter()
+            self._load_model_locked()
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            if self.model is None:
+                self.load_state = "failed"
+                return
+
+            # Loaded weights are not enough for /ready: the first inference still builds the graph
+            self.load_state = "warming"
+            self.load_state = "ready" if self._warm_up_locked() else "failed"
+
+    def _load_keras_model(self):
+        # TensorFlow is only imported by the process that actually holds the model
+        import tf_compat
+        from utils.model_loader import load_model_with_compat
+        from utils.model_factory import build_leaf_model
+
+        self._load_class_indices()
         try:
-            print("[INFO] Loading Leaf Disease Model (TensorFlow 2.15.0)...")
+            num_classes = len(self.class_indices) if self.class_indices else 38
+            model = build_leaf_model(num_classes)
+            model.load_weights(settings.LEAF_MODEL_PATH)
+            print("[INFO] Leaf Disease Model weights loaded via rebuilt architecture")
+        except Exception as weights_err:
+            print(f"[WARN] Weight-only model load failed, trying compatibility loader: {weights_err}")
+            model = load_model_with_compat(settings.LEAF_MODEL_PATH)
+        return model
 
-            if os.path.exists(settings.CLASS_INDICES_PATH):
-                with open(settings.CLASS_INDICES_PATH, 'r') as f:
-                    data = json.load(f)
-                    self.class_indices = {int(v): k for k, v in data.items()}
-                print("[INFO] Class indices loaded")
-            
-            if os.path.exists(settings.LEAF_MODEL_PATH):
-                try:
-                    num_classes = len(self.class_indices) if self.class_indices else 38
-                    self.model = build_leaf_model(num_classes)
-                    self.model.load_weights(settings.LEAF_MODEL_PATH)
-                    print("[INFO] Leaf Disease Model weights loaded via rebuilt architecture")
-                except Exception as weights_err:
-                    print(f"[WARN] Weight-only model load failed, trying compatibility loader: {weights_err}")
-                    self.model = load_model_with_compat(settings.LEAF_MODEL_PATH)
-                
+    def _load_model_locked(self):
+        backend = settings.INFERENCE_BACKEND.lower()
+        try:
+            print(f"[INFO] Loading Leaf Disease Model ({backend} backend)...")
+            self._load_class_indices()
+
+            if backend != "keras":
+                self.model = load_backend(backend, self.EXPORTED_MODEL_PATHS.get(backend, ""), settings.INFERENCE_THREADS)
+                print("[INFO] Leaf Disease Model Loaded Successfully")
+            elif os.path.exists(settings.LEAF_MODEL_PATH):
+                self.model = KerasBackend(self._load_keras_model())
                 print("[INFO] Leaf Disease Model Loaded Successfully")
             else:
                  print(f"[WARN] Leaf Model not found at {settings.LEAF_MODEL_PATH}")
@@ -47,23 +104,69 @@ class DiseaseService:
         except Exception as e:
             print(f"[ERROR] Error loading leaf model: {e}")
 
-    async def predict_disease(self, image_data: bytes):
-        if not self.model:
-            self._load_model()
+    def _warm_up_locked(self) -> bool:
+        started = time.perf_counter()
+        try:
+            self._predict_batch(np.zeros((1, 256, 256, 3), dtype=np.float32))
+        except Exception as e:
+            print(f"[ERROR] Leaf Disease Model warm-up inference failed: {e}")
+            return False
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+        print(f"[INFO] Leaf Disease Model warmed up in {self.load_seconds + self.warmup_seconds:.2f}s")
+        return True
+
+    def warm_up(self):
+        """Load the model ahead of the first request; loading ends with one dummy inference."""
+        self._load_model()
+
+    def load_status(self) -> dict:
+        return {
+            "state": self.load_state,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+        }
+
+    @property
+    def model_version(self) -> str:
+        if self._model_version is None:
+            backend = settings.INFERENCE_BACKEND.lower()
+            path = self.EXPORTED_MODEL_PATHS.get(backend, settings.LEAF_MODEL_PATH)
+            self._model_version = f"{backend}-{file_fingerprint(path)}"
+        return self._model_version
+
+    def _predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict(batch)
+
+    async def _infer(self, image: np.ndarray) -> np.ndarray:
+        if model_server_client is not None:
+            return await model_server_client.predict("leaf", image)
+        return await self.batcher.submit(image)
+
+    async def predict_disease(self, image_data: Union[bytes, BinaryIO]):
+        # Re-uploads of the same photo skip decoding and inference entirely
+        cache_key = await asyncio.to_thread(prediction_cache.make_key, "leaf", self.model_version, image_data)
+        predictions = await prediction_cache.get(cache_key)
+
+        if predictions is not None or model_server_client is not None:
+            self._load_class_indices()
+        elif not self.model:
+            # Load off the event loop; waits on the warm-up thread if it is already loading
+            await asyncio.to_thread(self._load_model)
             if not self.model:
                 return "Model Error", 0, {"error": "Model initialization failed"}
         
         try:
-            img = Image.open(io.BytesIO(image_data)).convert('RGB')
-            img = img.resize((256, 256))
-            img_array = np.array(img).astype('float32') / 255.0
-            img_array = np.expand_dims(img_array, axis=0)
+            if predictions is None:
+                # Raises InferenceQueueFull (-> 503) when this worker is saturated
+                async with inference_executor.admit():
+                    image = await asyncio.to_thread(load_image, image_data, 256)
 
-            # Predict in thread pool to avoid blocking
-            predictions = await asyncio.to_thread(self.model.predict, img_array, verbose=0)
+                    # Batched with concurrent requests, predicted on the inference pool to avoid blocking
+                    predictions = await self._infer(image)
+                await prediction_cache.set(cache_key, predictions)
             
-            pred_idx = np.argmax(predictions[0])
-            confidence = float(predictions[0][pred_idx]) * 100
+            pred_idx = int(np.argmax(predictions))
+            confidence = float(predictions[pred_idx]) * 100
             
             disease_name = self.class_indices.get(pred_idx, "Unknown")
             
@@ -72,6 +175,8 @@ class DiseaseService:
             
             return disease_name, confidence, treatment_info
             
+        except InferenceQueueFull:
+            raise
         except Exception as e:
             print(f"[ERROR] Prediction Error: {e}")
             return "Internal Error", 0, {"error": str(e)}
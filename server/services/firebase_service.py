@@ -1,5 +1,3 @@
-import firebase_admin
-from firebase_admin import credentials
 import os
 import logging
 
@@ -18,6 +16,10 @@ class FirebaseService:
         if self._initialized:
             return
 
+        # Imported here: the SDK is only needed by phone login, not at worker startup
+        import firebase_admin
+        from firebase_admin import credentials
+
         try:
             if not firebase_admin._apps:
                 # 1. Try environment variable for JSON path
@@ -41,4 +43,10 @@ class FirebaseService:
             logger.error(f"Failed to initialize Firebase Admin: {e}")
             # Do not raise, allow app to start but auth might fail
 
+    def verify_id_token(self, id_token: str) -> dict:
+        self.initialize()
+        from firebase_admin import auth as firebase_auth
+
+        return firebase_auth.verify_id_token(id_token)
+
 firebase_service = FirebaseService()
@@ -0,0 +1,150 @@
+import asyncio
+from typing import Callable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.image_preprocessing import normalize_into
+
+
+class InferenceBatcher:
+    """
+    Collects concurrent single-image requests into one batched forward pass.
+
+    Callers `await submit(image)` with one decoded uint8 image; a background
+    task gathers requests for up to `max_wait_ms` (or until `max_batch_size`
+    is reached), normalizes them into a pre-allocated float32 batch buffer,
+    runs `predict_fn` once off the event loop and hands each caller its own
+    row of the output.
+
+    Up to `max_in_flight` batches run at once, each in its own buffer. While
+    every buffer is busy, new requests keep queueing and go out together in
+    the next batch.
+    """
+
+    def __init__(self, name: str, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 input_shape: Tuple[int, ...], max_batch_size: int = 8, max_wait_ms: float = 10.0,
+                 executor=None, max_in_flight: int = 1):
+        self.name = name
+        self.predict_fn = predict_fn
+        # Anything with an async run(fn, *args); defaults to the loop's shared thread pool
+        self.executor = executor
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self.max_in_flight = max(1, int(max_in_flight))
+
+        # One buffer per in-flight batch, handed back when its forward pass returns
+        self._buffers = [
+            np.empty((self.max_batch_size, *input_shape), dtype=np.float32)
+            for _ in range(self.max_in_flight)
+        ]
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._free_buffers: Optional[asyncio.Queue] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._free_buffers = asyncio.Queue()
+            for buffer in self._buffers:
+                self._free_buffers.put_nowait(buffer)
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: np.ndarray) -> np.ndarray:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued before waiting for more
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Skip callers that gave up while we were waiting
+        return [(item, future) for item, future in batch if not future.done()]
+
+    def _predict_images(self, images: List[np.ndarray], buffer: np.ndarray) -> np.ndarray:
+        return self.predict_fn(normalize_into(images, buffer))
+
+    async def _run_batch(self, images: List[np.ndarray], buffer: np.ndarray) -> np.ndarray:
+        if self.executor is not None:
+            return await self.executor.run(self._predict_images, images, buffer)
+        return await asyncio.to_thread(self._predict_images, images, buffer)
+
+    async def _dispatch(self, batch: List[Tuple[np.ndarray, asyncio.Future]], buffer: np.ndarray):
+        try:
+            outputs = await self._run_batch([item for item, _ in batch], buffer)
+        except Exception as e:
+            print(f"[ERROR] {self.name} batch inference failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._free_buffers.put_nowait(buffer)
+
+        self.batches += 1
+        self.items += len(batch)
+
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    async def _run(self):
+        while True:
+            # Wait for a free buffer first, so requests pile up into bigger batches while all are busy
+            buffer = await self._free_buffers.get()
+            batch = await self._collect()
+            if not batch:
+                self._free_buffers.put_nowait(buffer)
+                continue
+
+            task = self._loop.create_task(self._dispatch(batch, buffer))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "in_flight": len(self._in_flight),
+            "max_in_flight": self.max_in_flight,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+    async def close(self):
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        for task in list(self._in_flight):
+            task.cancel()
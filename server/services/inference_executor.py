@@ -0,0 +1,70 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from config import settings
+
+
+class InferenceQueueFull(Exception):
+    """Raised when a worker already has as many inference requests in flight as it will accept."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Dedicated, bounded thread pool for model forward passes (leaf and root).
+
+    Keeping inference off the default executor stops it from starving other
+    to_thread work, and `admit()` caps how many requests may wait on it so an
+    overloaded worker sheds load with a 503 instead of letting latency grow
+    without bound.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, retry_after: int = 2):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+
+        self.pending = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise InferenceQueueFull(self.retry_after)
+
+        self.pending += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.pending -= 1
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+inference_executor = InferenceExecutor(
+    max_workers=settings.INFERENCE_WORKERS,
+    max_pending=settings.INFERENCE_MAX_PENDING,
+    retry_after=settings.INFERENCE_RETRY_AFTER,
+)
@@ -0,0 +1,78 @@
+import asyncio
+import json
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+from config import settings
+
+
+class ModelServerError(RuntimeError):
+    pass
+
+
+class ModelServerClient:
+    """
+    Delegates inference to the out-of-process model server (see model_server.py).
+
+    The input tensor is written into a shared-memory block and only its name,
+    shape and dtype travel over the Unix socket, so API workers never import
+    TensorFlow or hold a copy of the weights.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    async def _request(self, message: dict) -> dict:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_unix_connection(self.socket_path), self.timeout
+        )
+        try:
+            writer.write(json.dumps(message).encode("utf-8") + b"\n")
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+        if not line:
+            raise ModelServerError("Model server closed the connection")
+
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise ModelServerError(response.get("error", "Unknown model server error"))
+        return response
+
+    async def predict(self, model: str, image: np.ndarray) -> np.ndarray:
+        # Decoded uint8 images are sent as-is; normalization happens in the server's batch buffer
+        image = np.ascontiguousarray(image)
+        shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+        try:
+            np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)[...] = image
+            response = await self._request({
+                "op": "predict",
+                "model": model,
+                "shm": shm.name,
+                "shape": list(image.shape),
+                "dtype": image.dtype.str,
+            })
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return np.asarray(response["predictions"], dtype=np.float32)
+
+    async def status(self) -> dict:
+        response = await self._request({"op": "status"})
+        return response["models"]
+
+
+model_server_client: Optional[ModelServerClient] = (
+    ModelServerClient(settings.MODEL_SERVER_SOCKET, settings.MODEL_SERVER_TIMEOUT)
+    if settings.MODEL_SERVER_SOCKET
+    else None
+)
@@ -4,18 +4,15 @@ import logging
 import ssl
 import time
 from config import settings
-from sqlmodel import create_engine, Session, SQLModel
 from datetime import datetime
-from models import SoilData
+from services.soil_feed import soil_feed
+from services.soil_ingest import soil_ingest
+from services.soil_latest import soil_latest
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Sync Engine for MQTT Callbacks
-SYNC_DATABASE_URL = settings.DATABASE_URL.replace("+aiosqlite", "")
-engine = create_engine(SYNC_DATABASE_URL, echo=False)
-
 class MQTTService:
     def __init__(self):
         # Use newer callback API if available or standard one
@@ -53,38 +50,39 @@ class MQTTService:
         try:
             payload = msg.payload.decode()
             data = json.loads(payload)
-            logger.info(f"MQTT Message: {payload}")
+            logger.debug(f"MQTT Message: {payload}")
 
             # Prepare record
             nitrogen = int(int(data.get("nitrogen", 0)) * settings.SOIL_RAW_SCALE)
             phosphorus = int(int(data.get("phosphorus", 0)) * settings.SOIL_RAW_SCALE)
             potassium = int(int(data.get("potassium", 0)) * settings.SOIL_RAW_SCALE)
             
-            soil_record = SoilData(
-                node_id=data.get("node_id", "unknown"),
-                nitrogen=nitrogen,
-                phosphorus=phosphorus,
-                potassium=potassium,
-                ph=float(data.get("ph", 7.0)),
-                moisture=float(data.get("moisture", 0.0)),
-                temperature=float(data.get("temperature", 0.0)),
-                ec=float(data.get("ec", 0.0)),
-                timestamp=datetime.utcnow()
-            )
-            
             # Simple validation: ignore if NPK are all 0
-            if soil_record.nitrogen == 0 and soil_record.phosphorus == 0 and soil_record.potassium == 0:
+            if nitrogen == 0 and phosphorus == 0 and potassium == 0:
                 return
 
-            with Session(engine) as session:
-                session.add(soil_record)
-                session.commit()
-                logger.info(f"Saved DB Record for node: {soil_record.node_id}")
+            reading = {
+                "node_id": data.get("node_id", "unknown"),
+                "nitrogen": nitrogen,
+                "phosphorus": phosphorus,
+                "potassium": potassium,
+                "ph": float(data.get("ph", 7.0)),
+                "moisture": float(data.get("moisture", 0.0)),
+                "temperature": float(data.get("temperature", 0.0)),
+                "ec": float(data.get("ec", 0.0)),
+                "timestamp": datetime.utcnow(),
+            }
+
+            # Queued for the bulk writer; never block paho's network thread on the DB
+            row = soil_ingest.put(reading)
+            soil_latest.update(row)
+            soil_feed.publish(reading)
 
         except Exception as e:
             logger.error(f"MQTT process error: {e}")
 
     def start(self):
+        soil_ingest.start()
         try:
             logger.info(f"Connecting to {settings.MQTT_BROKER}:{settings.MQTT_PORT}...")
             self.client.connect(settings.MQTT_BROKER, settings.MQTT_PORT, 60)
@@ -95,6 +93,8 @@ class MQTTService:
     def stop(self):
         self.client.loop_stop()
         self.client.disconnect()
+        # Flush buffered readings before the process exits
+        soil_ingest.stop()
 
 mqtt_service = MQTTService()
 
@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from typing import BinaryIO, Optional, Union
+
+import numpy as np
+from config import settings
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_fingerprint(path: str) -> str:
+    """Cheap version tag for a model file: changes whenever the file is replaced."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    return f"{stat.st_size:x}-{int(stat.st_mtime):x}"
+
+
+class PredictionCache:
+    """
+    Content-addressed cache of model outputs for repeated uploads.
+
+    Keys hash the raw upload bytes together with the model name and version,
+    so a retrained or re-exported model never serves stale predictions.
+    Entries live in an in-memory LRU and, optionally, as .npy files on disk so
+    they survive restarts and are shared by workers on the same node.
+    """
+
+    DISK_PRUNE_INTERVAL = 100
+
+    def __init__(self, max_entries: int = 1024, disk_dir: Optional[str] = None, max_disk_entries: int = 10000):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._disk_writes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(model: str, model_version: str, data: Union[bytes, BinaryIO]) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{model}:{model_version}:".encode("utf-8"))
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            digest.update(data)
+        else:
+            # Spooled upload: hash in chunks rather than reading it all into memory
+            data.seek(0)
+            for chunk in iter(lambda: data.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+            data.seek(0)
+        return f"{model}-{digest.hexdigest()}"
+
+    def _remember(self, key: str, value: np.ndarray):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.npy")
+
+    def _read_disk(self, key: str) -> Optional[np.ndarray]:
+        try:
+            return np.load(self._disk_path(key))
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, value: np.ndarray):
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                np.save(f, value)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"[WARN] Prediction cache disk write failed: {e}")
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % self.DISK_PRUNE_INTERVAL == 0:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        try:
+            entries = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".npy")]
+        except OSError:
+            return
+        excess = len(entries) - self.max_disk_entries
+        if excess <= 0:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:excess]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        if not self.enabled:
+            return None
+
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self.disk_dir:
+            value = await asyncio.to_thread(self._read_disk, key)
+            if value is not None:
+                self._remember(key, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: np.ndarray):
+        if not self.enabled:
+            return
+
+        value = np.asarray(value, dtype=np.float32)
+        self._remember(key, value)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, value)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+prediction_cache = PredictionCache(
+    max_entries=settings.PREDICTION_CACHE_SIZE,
+    disk_dir=settings.PREDICTION_CACHE_DIR,
+    max_disk_entries=settings.PREDICTION_CACHE_DISK_MAX_ENTRIES,
+)
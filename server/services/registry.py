@@ -0,0 +1,63 @@
+import importlib
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+
+class ServiceRegistry:
+    """
+    ML-backed services by name, imported on first use.
+
+    Targets are "module:attribute" strings, so nothing is imported until
+    get() is called. Each service in turn loads its model, and with it
+    TensorFlow, onnxruntime or sklearn, only on first prediction or at
+    warm-up. A worker that only serves auth, chat or sensor data never
+    imports any of them.
+    """
+
+    def __init__(self, targets: Dict[str, str]):
+        self._targets = dict(targets)
+        self._services: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self):
+        return tuple(self._targets)
+
+    def get(self, name: str) -> Any:
+        service = self._services.get(name)
+        if service is None:
+            with self._lock:
+                service = self._services.get(name)
+                if service is None:
+                    module_name, attribute = self._targets[name].split(":", 1)
+                    service = getattr(importlib.import_module(module_name), attribute)
+                    self._services[name] = service
+        return service
+
+    def _imported(self, name: str) -> Optional[Any]:
+        # Also sees services whose module was imported directly (soil_service is used for scoring too)
+        service = self._services.get(name)
+        if service is None:
+            module_name, attribute = self._targets[name].split(":", 1)
+            service = getattr(sys.modules.get(module_name), attribute, None)
+        return service
+
+    def loaded(self) -> Dict[str, Any]:
+        """Services that have been imported so far (nothing is imported by asking)."""
+        services = {name: self._imported(name) for name in self._targets}
+        return {name: service for name, service in services.items() if service is not None}
+
+    def load_status(self) -> Dict[str, dict]:
+        loaded = self.loaded()
+        return {
+            name: loaded[name].load_status() if name in loaded else {"state": "cold"}
+            for name in self._targets
+        }
+
+
+ml_services = ServiceRegistry({
+    "leaf": "services.disease_service:disease_service",
+    "root": "services.root_service:root_service",
+    "crop": "services.soil_service:soil_service",
+})
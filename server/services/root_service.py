@@ -1,43 +1,101 @@
-import tf_compat
-import tensorflow as tf
 import numpy as np
 import asyncio
-from PIL import Image
-import io
+import threading
+import time
+from typing import BinaryIO, Union
 import json
 import os
 from config import settings
-from utils.model_factory import build_root_model
-from utils.model_loader import load_model_with_compat
+from services.inference_batcher import InferenceBatcher
+from services.inference_executor import inference_executor
+from services.model_client import model_server_client
+from services.prediction_cache import file_fingerprint, prediction_cache
+from utils.inference_backends import KerasBackend, load_backend
+from utils.image_preprocessing import load_image
 
 class RootService:
+    EXPORTED_MODEL_PATHS = {
+        "tflite": settings.ROOT_TFLITE_PATH,
+        "onnx": settings.ROOT_ONNX_PATH,
+    }
+
     def __init__(self):
         self.model = None
         self.class_labels = {}
         # Model is NOT loaded here to allow fast startup
+        self.load_state = "cold"
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self._load_lock = threading.Lock()
+        self._model_version = None
+        self.batcher = InferenceBatcher(
+            "root",
+            self._predict_batch,
+            input_shape=(224, 224, 3),
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+            executor=inference_executor,
+            max_in_flight=settings.INFERENCE_WORKERS,
+        )
+
+    def _load_class_labels(self):
+        if self.class_labels:
+            return
+
+        if os.path.exists(settings.ROOT_CLASS_INDICES_PATH):
+            with open(settings.ROOT_CLASS_INDICES_PATH, 'r') as f:
+                class_indices = json.load(f)
+            # Invert mapping: index -> label
+            self.class_labels = {v: k for k, v in class_indices.items()}
 
     def _load_model(self):
         if self.model is not None:
              return
-             
+
+        with self._load_lock:
+            if self.model is not None:
+                return
+
+            self.load_state = "loading"
+            started = time.perf_counter()
+            self._load_model_locked()
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            if self.model is None:
+                self.load_state = "failed"
+                return
+
+            # Loaded weights are not enough for /ready: the first inference still builds the graph
+            self.load_state = "warming"
+            self.load_state = "ready" if self._warm_up_locked() else "failed"
+
+    def _load_keras_model(self):
+        # TensorFlow is only imported by the process that actually holds the model
+        import tf_compat
+        from utils.model_factory import build_root_model
+        from utils.model_loader import load_model_with_compat
+
+        self._load_class_labels()
         try:
-            print("[INFO] Loading Root Disease Model (TensorFlow 2.15.0)...")
-            if os.path.exists(settings.ROOT_CLASS_INDICES_PATH):
-                with open(settings.ROOT_CLASS_INDICES_PATH, 'r') as f:
-                    class_indices = json.load(f)
-                # Invert mapping: index -> label
-                self.class_labels = {v: k for k, v in class_indices.items()}
-
-            if os.path.exists(settings.ROOT_MODEL_PATH):
-                try:
-                    num_classes = len(self.class_labels) if self.class_labels else 2
-                    self.model = build_root_model(num_classes)
-                    self.model.load_weights(settings.ROOT_MODEL_PATH)
-                    print("[INFO] Root Disease Model weights loaded via rebuilt architecture")
-                except Exception as weights_err:
-                    print(f"[WARN] Weight-only root model load failed, trying compatibility loader: {weights_err}")
-                    self.model = load_model_with_compat(settings.ROOT_MODEL_PATH)
-                
+            num_classes = len(self.class_labels) if self.class_labels else 2
+            model = build_root_model(num_classes)
+            model.load_weights(settings.ROOT_MODEL_PATH)
+            print("[INFO] Root Disease Model weights loaded via rebuilt architecture")
+        except Exception as weights_err:
+            print(f"[WARN] Weight-only root model load failed, trying compatibility loader: {weights_err}")
+            model = load_model_with_compat(settings.ROOT_MODEL_PATH)
+        return model
+
+    def _load_model_locked(self):
+        backend = settings.INFERENCE_BACKEND.lower()
+        try:
+            print(f"[INFO] Loading Root Disease Model ({backend} backend)...")
+            self._load_class_labels()
+
+            if backend != "keras":
+                self.model = load_backend(backend, self.EXPORTED_MODEL_PATHS.get(backend, ""), settings.INFERENCE_THREADS)
+                print("[INFO] Root Disease Model Loaded")
+            elif os.path.exists(settings.ROOT_MODEL_PATH):
+                self.model = KerasBackend(self._load_keras_model())
                 print("[INFO] Root Disease Model Loaded")
             else:
                 print(f"[WARN] Root Model not found at {settings.ROOT_MODEL_PATH}")
@@ -47,24 +105,67 @@ class RootService:
         except Exception as e:
             print(f"[ERROR] Error loading root model: {e}")
 
-    async def predict_root_disease(self, image_data: bytes):
-        # Lazy Load
-        if not self.model:
-             self._load_model()
+    def _warm_up_locked(self) -> bool:
+        started = time.perf_counter()
+        try:
+            self._predict_batch(np.zeros((1, 224, 224, 3), dtype=np.float32))
+        except Exception as e:
+            print(f"[ERROR] Root Disease Model warm-up inference failed: {e}")
+            return False
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+        print(f"[INFO] Root Disease Model warmed up in {self.load_seconds + self.warmup_seconds:.2f}s")
+        return True
+
+    def warm_up(self):
+        """Load the model ahead of the first request; loading ends with one dummy inference."""
+        self._load_model()
+
+    def load_status(self) -> dict:
+        return {
+            "state": self.load_state,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+        }
+
+    @property
+    def model_version(self) -> str:
+        if self._model_version is None:
+            backend = settings.INFERENCE_BACKEND.lower()
+            path = self.EXPORTED_MODEL_PATHS.get(backend, settings.ROOT_MODEL_PATH)
+            self._model_version = f"{backend}-{file_fingerprint(path)}"
+        return self._model_version
+
+    def _predict_batch(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict(batch)
+
+    async def predict_root_disease(self, image_data: Union[bytes, BinaryIO]):
+        # Re-uploads of the same photo skip decoding and inference entirely
+        cache_key = await asyncio.to_thread(prediction_cache.make_key, "root", self.model_version, image_data)
+        predictions = await prediction_cache.get(cache_key)
+
+        # Lazy Load (the model server holds the weights when delegating)
+        if predictions is not None or model_server_client is not None:
+            self._load_class_labels()
+        elif not self.model:
+             await asyncio.to_thread(self._load_model)
              if not self.model:
                  return "Model unavailable", "Please contact support."
 
         try:
-            # Preprocess Image
-            image = Image.open(io.BytesIO(image_data)).convert('RGB')
-            image = image.resize((224, 224))
-            img_array = np.array(image) / 255.0
-            img_array = np.expand_dims(img_array, axis=0)
-
-            # Predict
-            predictions = self.model.predict(img_array)
-            predicted_idx = np.argmax(predictions[0])
-            confidence = float(np.max(predictions[0])) * 100
+            if predictions is None:
+                # Raises InferenceQueueFull (-> 503) when this worker is saturated
+                async with inference_executor.admit():
+                    # Preprocess Image
+                    image = await asyncio.to_thread(load_image, image_data, 224)
+
+                    # Predict on the shared inference pool, batched like leaf detection
+                    if model_server_client is not None:
+                        predictions = await model_server_client.predict("root", image)
+                    else:
+                        predictions = await self.batcher.submit(image)
+                await prediction_cache.set(cache_key, predictions)
+            predicted_idx = int(np.argmax(predictions))
+            confidence = float(np.max(predictions)) * 100
             diagnosis = self.class_labels.get(predicted_idx, "Unknown")
             
             print(f"\n[AI DEBUG] Root Prediction: {diagnosis} ({confidence:.2f}%)")
@@ -0,0 +1,99 @@
+import asyncio
+from contextlib import contextmanager
+from itertools import chain
+from typing import Dict, List, Optional, Set
+
+
+class SoilSubscription:
+    """
+    One live-feed consumer. Holds at most one pending reading per node, so a
+    slow client skips straight to the freshest value instead of building an
+    unbounded backlog.
+    """
+
+    def __init__(self, node_id: Optional[str]):
+        self.node_id = node_id
+        self._pending: Dict[str, dict] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, reading: dict) -> bool:
+        """Queue a reading; returns True if it replaced one the client had not seen yet."""
+        coalesced = reading["node_id"] in self._pending
+        self._pending[reading["node_id"]] = reading
+        self._ready.set()
+        return coalesced
+
+    async def next(self, timeout: float) -> List[dict]:
+        """Wait for new readings; raises asyncio.TimeoutError if none arrive in time."""
+        if not self._pending:
+            self._ready.clear()
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        readings = list(self._pending.values())
+        self._pending.clear()
+        return readings
+
+
+class SoilFeedHub:
+    """
+    In-process pub/sub for live sensor readings.
+
+    MQTT callbacks publish from paho's network thread; fan-out is handed to the
+    event loop with call_soon_threadsafe, so subscribers are only ever touched
+    from the loop. Subscriptions are per node (or None for every node).
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[Optional[str], Set[SoilSubscription]] = {}
+
+        self.published = 0
+        self.delivered = 0
+        self.coalesced = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def publish(self, reading: dict):
+        """Thread-safe; drops the reading when nobody is listening."""
+        if self._loop is None or not self._subscribers:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._fan_out, reading)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def _fan_out(self, reading: dict):
+        self.published += 1
+        targets = chain(
+            self._subscribers.get(reading["node_id"], ()),
+            self._subscribers.get(None, ()),
+        )
+        for subscription in targets:
+            self.delivered += 1
+            if subscription.offer(reading):
+                self.coalesced += 1
+
+    @contextmanager
+    def subscribe(self, node_id: Optional[str] = None):
+        subscription = SoilSubscription(node_id)
+        self._subscribers.setdefault(node_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(node_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[node_id]
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced,
+        }
+
+
+soil_feed = SoilFeedHub()
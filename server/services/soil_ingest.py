@@ -0,0 +1,129 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlmodel import create_engine, Session
+from config import settings
+from models import SoilData
+
+logger = logging.getLogger(__name__)
+
+# Sync Engine for the ingestion thread
+SYNC_DATABASE_URL = settings.DATABASE_URL.replace("+aiosqlite", "")
+engine = create_engine(SYNC_DATABASE_URL, echo=False)
+
+
+class SoilIngestPipeline:
+    """
+    Buffers sensor readings and writes them to `soil_data` in bulk.
+
+    MQTT callbacks only enqueue (never touch the database), so paho's network
+    thread stays free for keepalives. A single writer thread flushes one
+    multi-row INSERT every `batch_size` rows or `flush_ms` milliseconds,
+    whichever comes first. The queue is bounded; when it is full the oldest
+    reading is dropped and counted.
+    """
+
+    def __init__(self, batch_size: int = 200, flush_ms: int = 1000, max_pending: int = 10000):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_ms) / 1000.0
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max(1, max_pending))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.received = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def put(self, reading: dict) -> dict:
+        """Queue a reading for the next flush; returns the row as it will be inserted."""
+        row = {"id": str(uuid.uuid4()), **reading}
+        self.received += 1
+        while True:
+            try:
+                self._queue.put_nowait(row)
+                return row
+            except queue.Full:
+                # Overflow: keep the freshest data, shed the oldest
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _drain(self) -> List[dict]:
+        rows = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(rows) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or (self._stop.is_set() and self._queue.empty()):
+                break
+            try:
+                rows.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return rows
+
+    def _write(self, rows: List[dict]):
+        if not rows:
+            return
+        try:
+            with Session(engine) as session:
+                session.execute(insert(SoilData), rows)
+                session.commit()
+            self.written += len(rows)
+            self.flushes += 1
+            logger.info(f"Saved {len(rows)} soil readings")
+        except Exception as e:
+            self.failed += len(rows)
+            logger.error(f"Soil ingest flush failed ({len(rows)} rows lost): {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._write(self._drain())
+
+        # Graceful shutdown: flush whatever is still queued
+        while not self._queue.empty():
+            rows = []
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(rows)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="soil-ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "written": self.written,
+            "pending": self._queue.qsize(),
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+
+soil_ingest = SoilIngestPipeline(
+    batch_size=settings.SOIL_INGEST_BATCH_SIZE,
+    flush_ms=settings.SOIL_INGEST_FLUSH_MS,
+    max_pending=settings.SOIL_INGEST_MAX_PENDING,
+)
@@ -0,0 +1,86 @@
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from models import SoilData
+
+
+def _has_npk(reading: dict) -> bool:
+    # Same rule as the DB query: all-zero NPK means a sensor error
+    return reading["nitrogen"] > 0 or reading["phosphorus"] > 0 or reading["potassium"] > 0
+
+
+class LatestReadings:
+    """
+    Newest valid reading per sensor node, kept in memory.
+
+    MQTT ingestion updates it as readings arrive (from paho's thread, hence
+    the lock), so `/api/soil/latest` only queries `soil_data` for a node this
+    worker has not heard from yet, and once for the newest reading across all
+    nodes: until that query has seeded the map, the nodes cached so far (say,
+    from one `?node_id=` lookup) say nothing about the others.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_node: Dict[str, dict] = {}
+        self._all_nodes_loaded = False
+
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, reading: dict):
+        # Caller holds the lock
+        current = self._by_node.get(reading["node_id"])
+        if current is None or reading["timestamp"] >= current["timestamp"]:
+            self._by_node[reading["node_id"]] = reading
+
+    def update(self, reading: dict):
+        if not _has_npk(reading):
+            return
+        with self._lock:
+            self._store(reading)
+
+    def get(self, node_id: Optional[str] = None) -> Optional[dict]:
+        with self._lock:
+            if node_id is not None:
+                return self._by_node.get(node_id)
+            if not self._all_nodes_loaded or not self._by_node:
+                return None
+            return max(self._by_node.values(), key=lambda reading: reading["timestamp"])
+
+    async def latest(self, session: AsyncSession, node_id: Optional[str] = None) -> Optional[dict]:
+        reading = self.get(node_id)
+        if reading is not None:
+            self.hits += 1
+            return reading
+
+        self.misses += 1
+        statement = select(SoilData).where(
+            (col(SoilData.nitrogen) > 0) | (col(SoilData.phosphorus) > 0) | (col(SoilData.potassium) > 0)
+        )
+        if node_id is not None:
+            statement = statement.where(SoilData.node_id == node_id)
+        result = await session.execute(statement.order_by(SoilData.timestamp.desc()).limit(1))
+        record = result.scalars().first()
+        reading = record.model_dump() if record is not None else None
+        with self._lock:
+            if reading is not None:
+                self._store(reading)
+            if node_id is None:
+                self._all_nodes_loaded = True
+        return reading
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "nodes": len(self._by_node),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+soil_latest = LatestReadings()
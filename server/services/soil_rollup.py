@@ -0,0 +1,333 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import func, select
+
+import models
+from config import settings
+from database import get_session
+
+METRICS = ("nitrogen", "phosphorus", "potassium", "ph", "moisture", "temperature", "ec")
+
+RAW, MINUTE, HOUR, DAY = "raw", "1m", "1h", "1d"
+RESOLUTIONS = (RAW, MINUTE, HOUR, DAY)
+
+
+def _floor_minute(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def _floor_hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _floor_day(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# Rollup tiers, finest first: resolution -> (bucket width, bucket floor)
+TIERS = {
+    MINUTE: (timedelta(minutes=1), _floor_minute),
+    HOUR: (timedelta(hours=1), _floor_hour),
+    DAY: (timedelta(days=1), _floor_day),
+}
+
+RETENTION_DAYS = {
+    RAW: settings.SOIL_RAW_RETENTION_DAYS,
+    MINUTE: settings.SOIL_MINUTE_RETENTION_DAYS,
+    HOUR: settings.SOIL_HOUR_RETENTION_DAYS,
+    DAY: settings.SOIL_DAY_RETENTION_DAYS,
+}
+
+# Readings can sit in the MQTT ingest buffer for up to one flush before they hit the table
+INGEST_GRACE = timedelta(milliseconds=settings.SOIL_INGEST_FLUSH_MS) + timedelta(seconds=1)
+BACKFILL_CHUNK = timedelta(hours=6)
+UPSERT_CHUNK = 500
+
+KEY_COLUMNS = ("resolution", "node_id", "bucket")
+
+_UPSERTS = {
+    "sqlite": sqlite_insert,
+    "postgresql": pg_insert,
+}
+
+# A source row is (node_id, time, samples, mins, maxs, sums), with one value per metric
+Source = Tuple[str, datetime, int, tuple, tuple, tuple]
+
+
+def _horizon(resolution: str, now: datetime) -> Optional[datetime]:
+    days = RETENTION_DAYS[resolution]
+    return now - timedelta(days=days) if days > 0 else None
+
+
+def _aggregate(sources: List[Source], floor) -> Dict[Tuple[str, datetime], list]:
+    buckets = {}
+    for node_id, ts, samples, mins, maxs, sums in sources:
+        key = (node_id, floor(ts))
+        agg = buckets.get(key)
+        if agg is None:
+            buckets[key] = [samples, list(mins), list(maxs), list(sums)]
+            continue
+        agg[0] += samples
+        for i in range(len(METRICS)):
+            agg[1][i] = min(agg[1][i], mins[i])
+            agg[2][i] = max(agg[2][i], maxs[i])
+            agg[3][i] += sums[i]
+    return buckets
+
+
+def _to_rows(resolution: str, buckets: Dict[Tuple[str, datetime], list]) -> List[dict]:
+    rows = []
+    for (node_id, bucket), (samples, mins, maxs, sums) in buckets.items():
+        row = {"resolution": resolution, "node_id": node_id, "bucket": bucket, "samples": samples}
+        for i, metric in enumerate(METRICS):
+            row[f"{metric}_min"] = float(mins[i])
+            row[f"{metric}_max"] = float(maxs[i])
+            row[f"{metric}_sum"] = float(sums[i])
+        rows.append(row)
+    return rows
+
+
+def _rollup_columns():
+    rollup = models.SoilRollup
+    return [getattr(rollup, f"{metric}_{part}") for part in ("min", "max", "sum") for metric in METRICS]
+
+
+async def _raw_sources(session: AsyncSession, start: datetime, end: datetime) -> List[Source]:
+    soil = models.SoilData
+    result = await session.execute(
+        select(soil.node_id, soil.timestamp, *[getattr(soil, metric) for metric in METRICS])
+        .where(soil.timestamp >= start, soil.timestamp < end)
+    )
+    return [(node_id, ts, 1, values, values, values) for node_id, ts, *values in result.all()]
+
+
+async def _rollup_sources(session: AsyncSession, resolution: str, start: datetime, end: datetime) -> List[Source]:
+    rollup = models.SoilRollup
+    result = await session.execute(
+        select(rollup.node_id, rollup.bucket, rollup.samples, *_rollup_columns())
+        .where(rollup.resolution == resolution, rollup.bucket >= start, rollup.bucket < end)
+    )
+    n = len(METRICS)
+    return [
+        (node_id, bucket, samples, values[:n], values[n:2 * n], values[2 * n:])
+        for node_id, bucket, samples, *values in result.all()
+    ]
+
+
+async def _upsert(session: AsyncSession, rows: List[dict]):
+    rollup = models.SoilRollup
+    upsert = _UPSERTS.get(session.bind.dialect.name)
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[i:i + UPSERT_CHUNK]
+        if upsert is None:
+            # Portable fallback for dialects without ON CONFLICT support
+            for row in chunk:
+                await session.merge(rollup(**row))
+            continue
+
+        statement = upsert(rollup).values(chunk)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={key: statement.excluded[key] for key in chunk[0] if key not in KEY_COLUMNS},
+        )
+        await session.execute(statement)
+
+
+async def _minute_watermark(session: AsyncSession) -> Optional[datetime]:
+    rollup = models.SoilRollup
+    result = await session.execute(select(func.max(rollup.bucket)).where(rollup.resolution == MINUTE))
+    return result.scalar()
+
+
+def _fold(resolution: str, sources: List[Source]) -> List[dict]:
+    return _to_rows(resolution, _aggregate(sources, TIERS[resolution][1]))
+
+
+async def rollup_soil_data(session: AsyncSession, now: Optional[datetime] = None) -> int:
+    """
+    Fold new raw readings into the 1-minute tier, then cascade into 1h and 1d.
+
+    Picks up from the newest minute bucket (re-folding it, since late readings
+    may have landed in it) and stops at the last closed minute. Works in
+    BACKFILL_CHUNK slices, each folded off the event loop and committed with
+    the hour and day buckets it touches, so a first-run backfill over a long
+    history neither blocks requests nor holds one write transaction open,
+    and an interrupted run resumes from the last committed slice. Every write
+    is an idempotent upsert, so overlapping runs are harmless. Returns the
+    number of minute buckets written.
+    """
+    now = now or datetime.utcnow()
+    end = _floor_minute(now - INGEST_GRACE)
+
+    start = await _minute_watermark(session)
+    if start is None:
+        # First run: backfill from the oldest reading
+        result = await session.execute(select(func.min(models.SoilData.timestamp)))
+        oldest = result.scalar()
+        if oldest is None:
+            return 0
+        start = _floor_minute(oldest)
+
+    written = 0
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + BACKFILL_CHUNK, end)
+        sources = await _raw_sources(session, chunk_start, chunk_end)
+        rows = await asyncio.to_thread(_fold, MINUTE, sources)
+        await _upsert(session, rows)
+        written += len(rows)
+
+        # Rebuild every coarser bucket the new minutes fall into from the tier below it
+        for resolution, source in ((HOUR, MINUTE), (DAY, HOUR)):
+            floor = TIERS[resolution][1]
+            sources = await _rollup_sources(session, source, floor(chunk_start), chunk_end)
+            await _upsert(session, await asyncio.to_thread(_fold, resolution, sources))
+
+        await session.commit()
+        chunk_start = chunk_end
+
+    return written
+
+
+async def prune_soil_data(session: AsyncSession, now: Optional[datetime] = None) -> dict:
+    """Delete raw readings and rollup buckets older than their tier's retention horizon."""
+    now = now or datetime.utcnow()
+    removed = {}
+
+    horizon = _horizon(RAW, now)
+    watermark = await _minute_watermark(session)
+    if horizon is not None and watermark is not None:
+        # Never drop readings that have not been folded into the minute tier yet
+        soil = models.SoilData
+        result = await session.execute(delete(soil).where(soil.timestamp < min(horizon, watermark)))
+        removed[RAW] = result.rowcount
+
+    rollup = models.SoilRollup
+    for resolution in TIERS:
+        horizon = _horizon(resolution, now)
+        if horizon is None:
+            continue
+        result = await session.execute(
+            delete(rollup).where(rollup.resolution == resolution, rollup.bucket < horizon)
+        )
+        removed[resolution] = result.rowcount
+
+    await session.commit()
+    return removed
+
+
+def _covers(resolution: str, start: datetime, now: datetime) -> bool:
+    horizon = _horizon(resolution, now)
+    return horizon is None or start >= horizon
+
+
+def pick_resolution(start: datetime, end: datetime, now: Optional[datetime] = None) -> str:
+    """
+    Coarsest rollup tier adequate for the range: the finest one that still
+    retains data back to `start` and yields at most SOIL_SERIES_MAX_POINTS.
+    """
+    now = now or datetime.utcnow()
+    span = end - start
+    for resolution, (width, _) in TIERS.items():
+        if span / width <= settings.SOIL_SERIES_MAX_POINTS and _covers(resolution, start, now):
+            return resolution
+    return DAY
+
+
+def _point(ts: datetime, samples: int, mins, maxs, means) -> dict:
+    point = {"timestamp": ts.isoformat() + "Z", "samples": samples}
+    for i, metric in enumerate(METRICS):
+        point[metric] = {"min": mins[i], "max": maxs[i], "mean": round(means[i], 3)}
+    return point
+
+
+async def _raw_points(session: AsyncSession, node_id: str, start: datetime, end: datetime, limit: int) -> List[dict]:
+    soil = models.SoilData
+    result = await session.execute(
+        select(soil.timestamp, *[getattr(soil, metric) for metric in METRICS])
+        .where(soil.node_id == node_id, soil.timestamp >= start, soil.timestamp < end)
+        .order_by(soil.timestamp)
+        .limit(limit)
+    )
+    return [_point(ts, 1, values, values, values) for ts, *values in result.all()]
+
+
+async def _rollup_points(session: AsyncSession, node_id: str, resolution: str, start: datetime, end: datetime) -> List[dict]:
+    rollup = models.SoilRollup
+    floor = TIERS[resolution][1]
+    result = await session.execute(
+        select(rollup.bucket, rollup.samples, *_rollup_columns())
+        .where(
+            rollup.resolution == resolution,
+            rollup.node_id == node_id,
+            rollup.bucket >= floor(start),
+            rollup.bucket < end,
+        )
+        .order_by(rollup.bucket)
+        .limit(settings.SOIL_SERIES_MAX_POINTS)
+    )
+    n = len(METRICS)
+    points = []
+    for bucket, samples, *values in result.all():
+        means = [total / samples for total in values[2 * n:]]
+        points.append(_point(bucket, samples, values[:n], values[n:2 * n], means))
+    return points
+
+
+async def soil_series(
+    session: AsyncSession,
+    node_id: str,
+    start: datetime,
+    end: datetime,
+    resolution: Optional[str] = None,
+) -> dict:
+    """
+    Time series for one node. Without an explicit resolution, raw readings
+    are served when the range is still retained and small enough; otherwise
+    the tier from pick_resolution().
+    """
+    max_points = settings.SOIL_SERIES_MAX_POINTS
+    points = None
+
+    if resolution == RAW:
+        points = await _raw_points(session, node_id, start, end, max_points)
+    elif resolution is None and _covers(RAW, start, datetime.utcnow()):
+        # One extra row tells us whether the raw range fits without a separate COUNT
+        raw = await _raw_points(session, node_id, start, end, max_points + 1)
+        if len(raw) <= max_points:
+            resolution, points = RAW, raw
+
+    if points is None:
+        resolution = resolution or pick_resolution(start, end)
+        points = await _rollup_points(session, node_id, resolution, start, end)
+
+    return {
+        "node_id": node_id,
+        "resolution": resolution,
+        "from": start.isoformat() + "Z",
+        "to": end.isoformat() + "Z",
+        "points": points,
+    }
+
+
+async def run_maintenance(interval: int):
+    """Background loop: roll up new readings and apply retention every `interval` seconds."""
+    while True:
+        try:
+            async for session in get_session():
+                written = await rollup_soil_data(session)
+                removed = await prune_soil_data(session)
+                if written or any(removed.values()):
+                    print(f"[INFO] Soil rollup: {written} minute buckets, pruned {removed}")
+                break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[ERROR] Soil rollup failed: {e}")
+        await asyncio.sleep(interval)
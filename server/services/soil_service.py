@@ -1,9 +1,34 @@
 import os
-import joblib
+import threading
+import time
 import numpy as np
+from typing import Any, Iterable, List, NamedTuple, Optional, Union
 from config import settings
 from schemas import soil as schemas
 
+# Crop model inputs, in training column order. The sensors report soil moisture,
+# which stands in for the dataset's humidity column.
+CROP_FEATURES = ("nitrogen", "phosphorus", "potassium", "temperature", "moisture", "ph", "rainfall")
+MODEL_FEATURES = ("N", "P", "K", "temperature", "humidity", "ph", "rainfall")
+FEATURE_DEFAULTS = {"temperature": 25.0, "rainfall": 100.0}
+
+# Soil problem bit flags, in the order analyze_health reports them
+PROBLEM_FLAGS = tuple(1 << i for i in range(8))
+ACIDIC, ALKALINE, LOW_NITROGEN, HIGH_NITROGEN, LOW_PHOSPHORUS, LOW_POTASSIUM, DRY, WATERLOGGED = PROBLEM_FLAGS
+NITROGEN_TOXIC = 250
+MOISTURE_DRY = 20
+MOISTURE_WATERLOGGED = 85
+PROBLEM_PENALTY = 15  # Health points lost per problem
+
+# Status codes index this tuple: score >= 85, >= 70, >= 50, below
+STATUS_NAMES = ("Excellent", "Good", "Fair", "Critical")
+
+
+class HealthScores(NamedTuple):
+    status: np.ndarray  # uint8 codes into STATUS_NAMES
+    score: np.ndarray  # 0-100
+    problems: np.ndarray  # uint8 bitmask of the problem flags above
+
 class SoilService:
     # Crop specific requirements (pH_min, pH_max, N_min, P_min, K_min)
     CROP_THRESHOLDS = {
@@ -17,65 +42,177 @@ class SoilService:
     def __init__(self):
         self.model = None
         self.label_encoder = None
-        self._load_models()
+        self.crop_names = None
+        # The crop model (and sklearn with it) loads on first use, not at import
+        self.load_state = "cold"
+        self.load_seconds = None
+        self._load_lock = threading.Lock()
+
+        # Threshold lookup table for vectorized scoring: one row per crop,
+        # columns (pH min, pH max, N min, P min, K min)
+        self._crop_index = {crop: i for i, crop in enumerate(self.CROP_THRESHOLDS)}
+        self._threshold_table = np.array([
+            (t["ph"][0], t["ph"][1], t["n"], t["p"], t["k"]) for t in self.CROP_THRESHOLDS.values()
+        ], dtype=np.float64)
+
+    @property
+    def crop_model_ready(self) -> bool:
+        return self.model is not None and self.crop_names is not None
+
+    def ensure_crop_model(self) -> bool:
+        """Load the crop model if it isn't yet (blocking; call off the event loop). True if usable."""
+        if self.load_state == "cold":
+            with self._load_lock:
+                if self.load_state == "cold":
+                    self.load_state = "loading"
+                    started = time.perf_counter()
+                    self._load_models()
+                    self.load_seconds = round(time.perf_counter() - started, 3)
+                    self.load_state = "ready" if self.crop_model_ready else "failed"
+        return self.crop_model_ready
 
     def _load_models(self):
+        import joblib  # Unpickling imports sklearn, which costs ~1s
+
         try:
             if os.path.exists(settings.SOIL_MODEL_PATH):
                 self.model = joblib.load(settings.SOIL_MODEL_PATH)
                 self.label_encoder = joblib.load(settings.LABEL_ENCODER_PATH)
+                feature_names = getattr(self.model, "feature_names_in_", None)
+                if feature_names is not None and tuple(feature_names) != MODEL_FEATURES:
+                    print(f"[WARN] Soil model expects features {list(feature_names)}, not {list(MODEL_FEATURES)}")
+                    self.model = None
+                    return
+                # predict_proba columns are model classes; map them to crop names once
+                self.crop_names = np.asarray(self.label_encoder.inverse_transform(self.model.classes_))
                 print("[INFO] Soil Analysis Models Loaded")
             else:
                 print(f"[WARN] Soil Model not found at {settings.SOIL_MODEL_PATH}")
         except Exception as e:
             print(f"[ERROR] Error loading soil models: {e}")
 
-    def analyze_health(self, data: schemas.SoilDataInput, crop_name: str = "generic"):
-        # Normalize crop name
+    def warm_up(self):
+        self.ensure_crop_model()
+
+    def load_status(self) -> dict:
+        return {"state": self.load_state, "load_seconds": self.load_seconds}
+
+    def _crop_rows(self, crop: Union[str, Iterable[str]], n: int) -> np.ndarray:
+        generic = self._crop_index["generic"]
+        if crop is None or isinstance(crop, str):
+            return np.full(n, self._crop_index.get((crop or "generic").lower(), generic))
+        # Per-reading crops: look up each distinct name once
+        names, inverse = np.unique(np.asarray(crop, dtype=str), return_inverse=True)
+        rows = np.array([self._crop_index.get(name.lower(), generic) for name in names])
+        return rows[inverse]
+
+    def score_health(self, ph, moisture, nitrogen, phosphorus, potassium,
+                     crop: Union[str, Iterable[str]] = "generic") -> HealthScores:
+        """
+        Health of many readings at once. Each argument is an array (or scalar)
+        of one measurement; `crop` is one crop for all readings or one per
+        reading. Messages are left to problem_messages().
+        """
+        ph, moisture, nitrogen, phosphorus, potassium = np.broadcast_arrays(*(
+            np.atleast_1d(np.asarray(values, dtype=np.float64))
+            for values in (ph, moisture, nitrogen, phosphorus, potassium)
+        ))
+        ph_min, ph_max, n_min, p_min, k_min = self._threshold_table[self._crop_rows(crop, len(ph))].T
+
+        problems = np.zeros(len(ph), dtype=np.uint8)
+        problems |= np.where(ph < ph_min, ACIDIC, np.where(ph > ph_max, ALKALINE, 0)).astype(np.uint8)
+        problems |= np.where(nitrogen < n_min, LOW_NITROGEN,
+                             np.where(nitrogen > NITROGEN_TOXIC, HIGH_NITROGEN, 0)).astype(np.uint8)
+        problems |= np.where(phosphorus < p_min, LOW_PHOSPHORUS, 0).astype(np.uint8)
+        problems |= np.where(potassium < k_min, LOW_POTASSIUM, 0).astype(np.uint8)
+        problems |= np.where(moisture < MOISTURE_DRY, DRY,
+                             np.where(moisture > MOISTURE_WATERLOGGED, WATERLOGGED, 0)).astype(np.uint8)
+
+        count = np.unpackbits(problems[:, None], axis=1).sum(axis=1)
+        score = np.clip(100 - PROBLEM_PENALTY * count.astype(np.int16), 0, 100)
+        status = ((score < 85).astype(np.uint8) + (score < 70) + (score < 50)).astype(np.uint8)
+        return HealthScores(status, score, problems)
+
+    def problem_messages(self, problems: int, crop_name: str = "generic") -> List[str]:
+        """Human-readable problems for one bitmask from score_health()."""
         crop_key = crop_name.lower() if crop_name else "generic"
         thresholds = self.CROP_THRESHOLDS.get(crop_key, self.CROP_THRESHOLDS["generic"])
-        
-        problems = []
-        
-        # pH Check
         ph_min, ph_max = thresholds["ph"]
-        if data.ph < ph_min:
-            problems.append(f"Soil is too Acidic for {crop_key} (Target: {ph_min}-{ph_max})")
-        elif data.ph > ph_max:
-            problems.append(f"Soil is too Alkaline for {crop_key} (Target: {ph_min}-{ph_max})")
-        
-        # Nitrogen Check
-        if data.nitrogen < thresholds["n"]:
-            problems.append(f"Nitrogen Deficiency (Low N for {crop_key})")
-        elif data.nitrogen > 250:
-            problems.append("Nitrogen Toxicity (Critical High N)")
-            
-        # Phosphorus Check
-        if data.phosphorus < thresholds["p"]:
-            problems.append(f"Phosphorus Deficiency (Low P for {crop_key})")
-            
-        # Potassium Check
-        if data.potassium < thresholds["k"]:
-            problems.append(f"Potassium Deficiency (Low K for {crop_key})")
-
-        # Moisture Check
-        if data.moisture < 20:
-            problems.append("Critical: Very Dry Soil")
-        elif data.moisture > 85:
-            problems.append("Critical: Soil is Waterlogged")
-            
-        health_percentage = 100 - (len(problems) * 15)
-        health_percentage = max(0, min(100, health_percentage))
-        
-        if health_percentage >= 85:
-            status = "Excellent"
-        elif health_percentage >= 70:
-            status = "Good"
-        elif health_percentage >= 50:
-            status = "Fair"
-        else:
-            status = "Critical"
-            
-        return status, health_percentage, problems
+
+        messages = []
+        if problems & ACIDIC:
+            messages.append(f"Soil is too Acidic for {crop_key} (Target: {ph_min}-{ph_max})")
+        if problems & ALKALINE:
+            messages.append(f"Soil is too Alkaline for {crop_key} (Target: {ph_min}-{ph_max})")
+        if problems & LOW_NITROGEN:
+            messages.append(f"Nitrogen Deficiency (Low N for {crop_key})")
+        if problems & HIGH_NITROGEN:
+            messages.append("Nitrogen Toxicity (Critical High N)")
+        if problems & LOW_PHOSPHORUS:
+            messages.append(f"Phosphorus Deficiency (Low P for {crop_key})")
+        if problems & LOW_POTASSIUM:
+            messages.append(f"Potassium Deficiency (Low K for {crop_key})")
+        if problems & DRY:
+            messages.append("Critical: Very Dry Soil")
+        if problems & WATERLOGGED:
+            messages.append("Critical: Soil is Waterlogged")
+        return messages
+
+    def analyze_health(self, data: schemas.SoilDataInput, crop_name: str = "generic"):
+        # Normalize crop name
+        crop_key = crop_name.lower() if crop_name else "generic"
+        scores = self.score_health(data.ph, data.moisture, data.nitrogen, data.phosphorus, data.potassium, crop_key)
+        status = STATUS_NAMES[scores.status[0]]
+        return status, int(scores.score[0]), self.problem_messages(int(scores.problems[0]), crop_key)
+
+    @staticmethod
+    def readings_matrix(readings: Iterable[Any]) -> np.ndarray:
+        """(n, 7) float matrix in model column order from dicts or objects (SoilDataInput, SoilData rows)."""
+        rows = []
+        for reading in readings:
+            row = []
+            for feature in CROP_FEATURES:
+                value = reading.get(feature) if isinstance(reading, dict) else getattr(reading, feature, None)
+                row.append(FEATURE_DEFAULTS.get(feature, 0.0) if value is None else value)
+            rows.append(row)
+        return np.asarray(rows, dtype=np.float64).reshape(-1, len(CROP_FEATURES))
+
+    def predict_crop_proba(self, features: np.ndarray) -> np.ndarray:
+        """Crop probabilities for every row in one predict_proba call; columns follow `crop_names`."""
+        if not self.ensure_crop_model():
+            raise RuntimeError("Crop recommendation model is not loaded")
+        if len(features) == 0:
+            return np.zeros((0, len(self.crop_names)))
+        if getattr(self.model, "feature_names_in_", None) is not None:
+            # Fitted on a DataFrame: pass the same column names (checked at load) rather than a bare matrix
+            import pandas as pd
+
+            features = pd.DataFrame(features, columns=list(MODEL_FEATURES))
+        return self.model.predict_proba(features)
+
+    def top_crops(self, probabilities: np.ndarray, k: int = 3) -> List[List[dict]]:
+        """Top-k crops per row of a probability matrix, most likely first."""
+        k = max(1, min(k, probabilities.shape[1]))
+        # argpartition finds each row's top k in linear time; only those k get sorted
+        top = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+        top_probabilities = np.take_along_axis(probabilities, top, axis=1)
+        order = np.argsort(-top_probabilities, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_probabilities = np.take_along_axis(top_probabilities, order, axis=1)
+        return [
+            [{"crop": str(crop), "probability": round(float(p), 4)} for crop, p in zip(self.crop_names[row], row_p)]
+            for row, row_p in zip(top, top_probabilities)
+        ]
+
+    def recommend_crops(self, readings: Iterable[Any], k: int = 3) -> List[List[dict]]:
+        """Top-k crops for each reading."""
+        return self.top_crops(self.predict_crop_proba(self.readings_matrix(readings)), k)
+
+    def recommend_crops_for_window(self, readings: Iterable[Any], k: int = 3) -> Optional[List[dict]]:
+        """Top-k crops for a window of readings (mean of per-reading probabilities); None if empty."""
+        probabilities = self.predict_crop_proba(self.readings_matrix(readings))
+        if len(probabilities) == 0:
+            return None
+        return self.top_crops(probabilities.mean(axis=0, keepdims=True), k)[0]
 
 soil_service = SoilService()
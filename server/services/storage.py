@@ -0,0 +1,164 @@
+import asyncio
+import io
+from abc import ABC, abstractmethod
+import os
+import shutil
+import uuid
+from typing import BinaryIO, Optional, Tuple, Union
+
+from PIL import Image
+
+from config import settings
+
+Source = Union[bytes, BinaryIO]
+
+
+class StorageBackend(ABC):
+    """Where uploaded images live. Writes never block the event loop."""
+
+    @abstractmethod
+    async def save(self, key: str, source: Source, content_type: str) -> None:
+        ...
+
+    @abstractmethod
+    def url(self, key: str, base_url: str) -> str:
+        ...
+
+
+class LocalStorage(StorageBackend):
+    """Files under `root` (served by the app's StaticFiles mount at `url_path`)."""
+
+    def __init__(self, root: str, url_path: str):
+        self.root = root
+        self.url_path = url_path.strip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _write(self, key: str, source: Source):
+        path = os.path.join(self.root, key)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                f.write(source)
+            else:
+                source.seek(0)
+                shutil.copyfileobj(source, f)
+        os.replace(temp_path, path)
+
+    async def save(self, key: str, source: Source, content_type: str) -> None:
+        await asyncio.to_thread(self._write, key, source)
+
+    def url(self, key: str, base_url: str) -> str:
+        return f"{base_url.rstrip('/')}/{self.url_path}/{key}"
+
+
+class S3Storage(StorageBackend):
+    """
+    Any S3-compatible object store (AWS, MinIO, R2, ...). Point
+    S3_ENDPOINT_URL at a local MinIO to run it without a cloud account.
+    `client` replaces the boto3 client (see scripts/check_storage.py).
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        public_url: Optional[str] = None,
+        client=None,
+    ):
+        self.bucket = bucket
+        if client is None:
+            import boto3  # Optional dependency, only needed for STORAGE_BACKEND=s3
+
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region,
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key,
+            )
+        self.client = client
+        if public_url:
+            self.public_url = public_url.rstrip("/")
+        elif endpoint_url:
+            self.public_url = f"{endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            self.public_url = f"https://{bucket}.s3.amazonaws.com"
+
+    def _write(self, key: str, source: Source, content_type: str):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        source.seek(0)
+        self.client.upload_fileobj(
+            source,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": content_type, "CacheControl": "public, max-age=31536000, immutable"},
+        )
+
+    async def save(self, key: str, source: Source, content_type: str) -> None:
+        await asyncio.to_thread(self._write, key, source, content_type)
+
+    def url(self, key: str, base_url: str) -> str:
+        return f"{self.public_url}/{key}"
+
+
+def make_thumbnail(source: Source, size: int) -> bytes:
+    """JPEG thumbnail that fits in size x size, decoded in draft mode so large photos stay cheap."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    else:
+        source.seek(0)
+
+    with Image.open(source) as img:
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+        img.thumbnail((size, size), Image.BILINEAR, reducing_gap=2.0)
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=80, optimize=True)
+        return out.getvalue()
+
+
+class ImageStore:
+    """Stores an upload's original plus a pre-generated thumbnail for list views."""
+
+    def __init__(self, backend: StorageBackend, thumbnail_size: int = 320):
+        self.backend = backend
+        self.thumbnail_size = thumbnail_size
+
+    async def save_upload(self, source: Source, base_url: str, extension: str = "jpg",
+                          content_type: str = "image/jpeg") -> Tuple[str, Optional[str]]:
+        """Returns (image_url, thumbnail_url); thumbnail_url is None if the image could not be decoded."""
+        name = str(uuid.uuid4())
+        key = f"{name}.{extension}"
+
+        thumbnail_url = None
+        try:
+            thumbnail = await asyncio.to_thread(make_thumbnail, source, self.thumbnail_size)
+        except Exception as e:
+            print(f"[WARN] Thumbnail generation failed: {e}")
+        else:
+            thumb_key = f"{name}_{self.thumbnail_size}.jpg"
+            await self.backend.save(thumb_key, thumbnail, "image/jpeg")
+            thumbnail_url = self.backend.url(thumb_key, base_url)
+
+        await self.backend.save(key, source, content_type)
+        return self.backend.url(key, base_url), thumbnail_url
+
+
+def _create_backend() -> StorageBackend:
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            public_url=settings.S3_PUBLIC_URL,
+        )
+    return LocalStorage(settings.UPLOAD_DIR, settings.UPLOAD_URL_PATH)
+
+
+image_store = ImageStore(_create_backend(), thumbnail_size=settings.UPLOAD_THUMBNAIL_SIZE)
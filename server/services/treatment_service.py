@@ -1,244 +1,111 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from config import settings
+
+TREATMENT_FIELDS = ("severity", "immediate", "preventive", "pesticides")
+
+
+def _freeze(entry: dict) -> Mapping:
+    """Immutable treatment entry with interned strings (the same advice repeats across diseases)."""
+    frozen = {}
+    for field in TREATMENT_FIELDS:
+        value = entry.get(field, [] if field != "severity" else "Unknown")
+        if isinstance(value, str):
+            frozen[field] = sys.intern(value)
+        else:
+            frozen[field] = tuple(sys.intern(item) for item in value)
+    return MappingProxyType(frozen)
+
+
+class TreatmentKnowledgeBase:
+    """One parsed, versioned snapshot of the treatments data file."""
+
+    def __init__(self, document: dict, etag: str):
+        self.version = document.get("version", 1)
+        self.default_language = document.get("default_language", "en")
+        self.etag = etag
+
+        # (disease, language) -> entry; translations are overlays on the base entry,
+        # resolved once here so lookups never merge at request time
+        entries = {}
+        for disease, base in document.get("treatments", {}).items():
+            disease = sys.intern(disease)
+            entries[(disease, self.default_language)] = _freeze(base)
+            for language, overlay in base.get("translations", {}).items():
+                entries[(disease, language)] = _freeze({**base, **overlay})
+        self.entries: Mapping = MappingProxyType(entries)
+        self.fallback = _freeze(document.get("fallback", {}))
+
+    def lookup(self, disease_name: str, language: Optional[str] = None) -> Optional[Mapping]:
+        if language and language != self.default_language:
+            entry = self.entries.get((disease_name, language))
+            if entry is not None:
+                return entry
+        return self.entries.get((disease_name, self.default_language))
+
+
 class TreatmentService:
-    def get_treatment(self, disease_name: str):
-        # Dictionary of treatments
-        # This can be moved to a JSON file or DB later
-        treatments = {
-            "Apple___Apple_scab": {
-                "severity": "Medium",
-                "immediate": ["Remove infected leaves", "Apply Fungicide"],
-                "preventive": ["Clean fall leaves", "Prune for airflow"],
-                "pesticides": ["Captan", "Sulfur"]
-            },
-            "Apple___Black_rot": {
-                "severity": "High",
-                "immediate": ["Prune infected parts", "Remove mummified fruit"],
-                "preventive": ["Sanitize tools", "Remove dead wood"],
-                "pesticides": ["Thiophanate-methyl"]
-            },
-            "Apple___Cedar_apple_rust": {
-                "severity": "Medium",
-                "immediate": ["Prune galls from cedar"],
-                "preventive": ["Plant resistant varieties"],
-                "pesticides": ["Myclobutanil"]
-            },
-            "Apple___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Blueberry___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Cherry_(including_sour)___Powdery_mildew": {
-                "severity": "Medium",
-                "immediate": ["Prune infected branches", "Apply fungicide"],
-                "preventive": ["Improve air circulation"],
-                "pesticides": ["Myclobutanil", "Sulfur"]
-            },
-            "Cherry_(including_sour)___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Corn_(maize)___Cercospora_leaf_spot_Gray_leaf_spot": {
-                "severity": "High",
-                "immediate": ["Rotate crops", "Use resistant hybrids"],
-                "preventive": ["Plow under crop debris"],
-                "pesticides": ["Azoxystrobin"]
-            },
-            "Corn_(maize)___Common_rust_": {
-                "severity": "Medium",
-                "immediate": ["Apply fungicide early"],
-                "preventive": ["Plant resistant varieties"],
-                "pesticides": ["Mancozeb"]
-            },
-            "Corn_(maize)___Northern_Leaf_Blight": {
-                "severity": "High",
-                "immediate": ["Use resistant hybrids"],
-                "preventive": ["Crop rotation"],
-                "pesticides": ["Propiconazole"]
-            },
-            "Corn_(maize)___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Grape___Black_rot": {
-                "severity": "High",
-                "immediate": ["Remove infected berries"],
-                "preventive": ["Proper pruning", "Sun exposure"],
-                "pesticides": ["Mancozeb"]
-            },
-            "Grape___Esca_(Black_Measles)": {
-                "severity": "High",
-                "immediate": ["Remove infected vines"],
-                "preventive": ["Avoid large pruning wounds"],
-                "pesticides": []
-            },
-            "Grape___Leaf_blight_(Isariopsis_Leaf_Spot)": {
-                "severity": "Medium",
-                "immediate": ["Fungicide spray"],
-                "preventive": ["Manage canopy"],
-                "pesticides": ["Copper-based"]
-            },
-            "Grape___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Orange___Haunglongbing_(Citrus_greening)": {
-                "severity": "Critical",
-                "immediate": ["Remove infected tree", "Control psyllids"],
-                "preventive": ["Use disease-free nursery trees"],
-                "pesticides": ["Imidacloprid (for vectors)"]
-            },
-            "Peach___Bacterial_spot": {
-                "severity": "High",
-                "immediate": ["Copper spray", "Avoid overhead watering"],
-                "preventive": ["Plant resistant varieties"],
-                "pesticides": ["Copper fungicide", "Oxytetracycline"]
-            },
-            "Peach___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Pepper,_bell___Bacterial_spot": {
-                "severity": "High",
-                "immediate": ["Remove infected plants", "Copper spray"],
-                "preventive": ["Use disease-free seeds", "Crop rotation"],
-                "pesticides": ["Copper hydroxide"]
-            },
-            "Pepper,_bell___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Potato___Early_blight": {
-                "severity": "Medium",
-                "immediate": ["Remove infected leaves", "Fungicide application"],
-                "preventive": ["Crop rotation", "Drip irrigation"],
-                "pesticides": ["Chlorothalonil", "Mancozeb"]
-            },
-            "Potato___Late_blight": {
-                "severity": "Critical",
-                "immediate": ["Destroy infected plants", "Fungicide application"],
-                "preventive": ["Use certified seed potatoes"],
-                "pesticides": ["Mancozeb", "Chlorothalonil"]
-            },
-            "Potato___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Raspberry___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Soybean___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Squash___Powdery_mildew": {
-                "severity": "Medium",
-                "immediate": ["Remove infected leaves", "Apply sulfur"],
-                "preventive": ["Plant resistant varieties"],
-                "pesticides": ["Sulfur", "Potassium bicarbonate"]
-            },
-            "Strawberry___Leaf_scorch": {
-                "severity": "Medium",
-                "immediate": ["Remove infected leaves"],
-                "preventive": ["Plant resistant varieties"],
-                "pesticides": ["Captan", "Thiram"]
-            },
-            "Strawberry___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            },
-            "Tomato___Bacterial_spot": {
-                "severity": "High",
-                "immediate": ["Copper spray", "Remove infected plants"],
-                "preventive": ["Use disease-free seeds"],
-                "pesticides": ["Copper hydroxide"]
-            },
-            "Tomato___Early_blight": {
-                "severity": "Medium",
-                "immediate": ["Trim lower leaves", "Mulch soil"],
-                "preventive": ["Crop rotation", "Stake plants"],
-                "pesticides": ["Chlorothalonil"]
-            },
-            "Tomato___Late_blight": {
-                "severity": "Critical",
-                "immediate": ["Destroy infected plants immediately"],
-                "preventive": ["Avoid overhead watering"],
-                "pesticides": ["Mancozeb", "Chlorothalonil"]
-            },
-            "Tomato___Leaf_Mold": {
-                "severity": "Medium",
-                "immediate": ["Improve ventilation"],
-                "preventive": ["Reduce humidity"],
-                "pesticides": ["Copper fungicide"]
-            },
-            "Tomato___Septoria_leaf_spot": {
-                "severity": "Medium",
-                "immediate": ["Remove infected leaves"],
-                "preventive": ["Mulch base of plant"],
-                "pesticides": ["Chlorothalonil"]
-            },
-            "Tomato___Spider_mites Two-spotted_spider_mite": {
-                "severity": "Medium",
-                "immediate": ["Spray water", "Use miticide"],
-                "preventive": ["Avoid dusty conditions"],
-                "pesticides": ["Neem oil"]
-            },
-            "Tomato___Target_Spot": {
-                "severity": "Medium",
-                "immediate": ["Improve airflow"],
-                "preventive": ["Remove crop debris"],
-                "pesticides": ["Chlorothalonil"]
-            },
-            "Tomato___Tomato_Yellow_Leaf_Curl_Virus": {
-                "severity": "High",
-                "immediate": ["Control whiteflies", "Use reflective mulch"],
-                "preventive": ["Weed control"],
-                "pesticides": ["Imidacloprid (for vectors)"]
-            },
-            "Tomato___Tomato_mosaic_virus": {
-                "severity": "High",
-                "immediate": ["Remove infected plants", "Wash hands"],
-                "preventive": ["Sanitize tools"],
-                "pesticides": []
-            },
-            "Tomato___healthy": {
-                "severity": "None",
-                "immediate": ["Monitor regularly"],
-                "preventive": ["Maintain good irrigation"],
-                "pesticides": []
-            }
-        }
-        
-        # Default fallback
-        return treatments.get(disease_name, {
-            "severity": "Unknown",
-            "immediate": ["Consult local agricultural expert"],
-            "preventive": ["Isolate plant"],
-            "pesticides": []
-        })
-
-treatment_service = TreatmentService()
+    """
+    Treatment advice per disease class, loaded once from TREATMENTS_PATH.
+
+    The file is re-read when its mtime changes (checked at most every
+    TREATMENTS_RELOAD_SECONDS), so edits go live without a restart. A reload
+    that fails to parse keeps serving the previous snapshot.
+    """
+
+    def __init__(self, path: str, reload_interval: float = 5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._kb: Optional[TreatmentKnowledgeBase] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, mtime: float):
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            kb = TreatmentKnowledgeBase(json.loads(raw), hashlib.blake2b(raw, digest_size=12).hexdigest())
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Failed to load treatments from {self.path}: {e}")
+            if self._kb is None:
+                self._kb = TreatmentKnowledgeBase({}, "empty")
+            return
+
+        self._kb = kb
+        self._mtime = mtime
+        print(f"[INFO] Loaded {len(kb.entries)} treatment entries (v{kb.version})")
+
+    @property
+    def knowledge_base(self) -> TreatmentKnowledgeBase:
+        now = time.monotonic()
+        if self._kb is None or now - self._checked_at >= self.reload_interval:
+            with self._lock:
+                if self._kb is None or now - self._checked_at >= self.reload_interval:
+                    self._checked_at = now
+                    try:
+                        mtime = os.stat(self.path).st_mtime
+                    except OSError:
+                        mtime = None
+                    if self._kb is None or (mtime is not None and mtime != self._mtime):
+                        self._load(mtime)
+        return self._kb
+
+    def lookup(self, disease_name: str, language: Optional[str] = None) -> Optional[Mapping]:
+        return self.knowledge_base.lookup(disease_name, language)
+
+    def get_treatment(self, disease_name: str, language: Optional[str] = None) -> dict:
+        kb = self.knowledge_base
+        entry = kb.lookup(disease_name, language) or kb.fallback
+        # Shallow copy: callers get a plain dict (JSON/DB friendly) over immutable values
+        return dict(entry)
+
+
+treatment_service = TreatmentService(settings.TREATMENTS_PATH, settings.TREATMENTS_RELOAD_SECONDS)
@@ -0,0 +1,87 @@
+import copy
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import make_transient_to_detached
+
+import models
+from config import settings
+
+
+class UserCache:
+    """
+    Short-lived cache of authenticated users, keyed by token subject (email).
+
+    Entries are detached snapshots that no session owns; callers attach a
+    private copy with `session.merge(snapshot, load=False)`, which costs no
+    SQL. The TTL bounds staleness across workers, and writes to a user
+    invalidate the local entry immediately.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, models.User]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, subject: str) -> Optional[models.User]:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(subject)
+        if entry is not None:
+            expires_at, snapshot = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(subject)
+                self.hits += 1
+                return snapshot
+            del self._entries[subject]
+
+        self.misses += 1
+        return None
+
+    def set(self, subject: str, user: models.User):
+        if not self.enabled:
+            return
+
+        snapshot = models.User(**copy.deepcopy(user.model_dump()))
+        make_transient_to_detached(snapshot)
+
+        self._entries[subject] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        if self._entries.pop(subject, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_user_id(self, user_id: str):
+        for subject, (_, snapshot) in list(self._entries.items()):
+            if snapshot.id == user_id:
+                self.invalidate(subject)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+user_cache = UserCache(
+    max_entries=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,38 @@
+import io
+from typing import BinaryIO, Sequence, Union
+
+import numpy as np
+from PIL import Image
+
+_SCALE = np.float32(1.0 / 255.0)
+
+
+def load_image(source: Union[bytes, str, BinaryIO], size: int) -> np.ndarray:
+    """
+    Decode an image straight to a (size, size, 3) uint8 array.
+
+    JPEGs are decoded in draft mode, letting libjpeg downscale by 1/2, 1/4 or
+    1/8 inside the DCT so a 12MP phone photo never materialises at full size.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    elif hasattr(source, "seek"):
+        # Shared upload handle; earlier stages (hashing, storage) leave it at EOF
+        source.seek(0)
+
+    with Image.open(source) as img:
+        # No-op for non-JPEG formats; never drafts below the requested size
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+        if img.size != (size, size):
+            img = img.resize((size, size), Image.BILINEAR, reducing_gap=2.0)
+        return np.asarray(img, dtype=np.uint8)
+
+
+def normalize_into(images: Sequence[np.ndarray], out: np.ndarray) -> np.ndarray:
+    """Scale uint8 images to [0, 1] float32 directly into the leading rows of `out`."""
+    batch = out[:len(images)]
+    for slot, image in zip(batch, images):
+        np.multiply(image, _SCALE, out=slot, casting="unsafe")
+    return batch
+
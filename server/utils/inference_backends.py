@@ -0,0 +1,102 @@
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+SUPPORTED_BACKENDS = ("keras", "tflite", "onnx")
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        # predict_on_batch skips the per-call data adapter setup of predict()
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+class TFLiteBackend:
+    name = "tflite"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        try:
+            # The standalone runtime avoids importing full TensorFlow on serving nodes
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tf_compat
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self.input_detail["shape"][0])
+        # An interpreter holds mutable tensor buffers and must not be invoked concurrently
+        self._lock = threading.Lock()
+
+    def _resize(self, batch_size: int):
+        if batch_size == self._batch_size:
+            return
+        shape = list(self.input_detail["shape"])
+        shape[0] = batch_size
+        self.interpreter.resize_tensor_input(self.input_detail["index"], shape)
+        self.interpreter.allocate_tensors()
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            self._resize(len(batch))
+
+            dtype = self.input_detail["dtype"]
+            if dtype != np.float32:
+                # Fully-quantized model: map float input onto the integer grid
+                scale, zero_point = self.input_detail["quantization"]
+                info = np.iinfo(dtype)
+                batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max)
+            self.interpreter.set_tensor(self.input_detail["index"], batch.astype(dtype, copy=False))
+            self.interpreter.invoke()
+
+            output = self.interpreter.get_tensor(self.output_detail["index"])
+            if output.dtype != np.float32:
+                scale, zero_point = self.output_detail["quantization"]
+                output = (output.astype(np.float32) - zero_point) * scale
+            return np.array(output, dtype=np.float32)
+
+
+class ONNXBackend:
+    name = "onnx"
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        outputs = self.session.run(None, {self.input_name: batch.astype(np.float32, copy=False)})
+        return np.asarray(outputs[0], dtype=np.float32)
+
+
+def load_backend(kind: str, model_path: str, num_threads: Optional[int] = None):
+    """Open an exported (TFLite / ONNX) model file as an inference backend."""
+    kind = kind.lower()
+    if kind not in ("tflite", "onnx"):
+        raise ValueError(f"Unsupported inference backend: {kind}. Expected one of {SUPPORTED_BACKENDS}")
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"{kind} model not found at {model_path}")
+    if kind == "tflite":
+        return TFLiteBackend(model_path, num_threads)
+    return ONNXBackend(model_path, num_threads)
@@ -0,0 +1,29 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException
+from sqlmodel import and_, or_
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque keyset cursor for the last row of a newest-first page."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(created_at), row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def older_than(cursor: str, created_at_column, id_column):
+    """WHERE clause for rows after `cursor` in (created_at DESC, id DESC) order."""
+    cursor_created_at, cursor_id = decode_cursor(cursor)
+    return or_(
+        created_at_column < cursor_created_at,
+        and_(created_at_column == cursor_created_at, id_column < cursor_id),
+    )
@@ -0,0 +1,132 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import HTTPException, UploadFile
+from PIL import Image, UnidentifiedImageError
+
+from config import settings
+
+# Sniffed PIL format -> (file extension, content type)
+ALLOWED_IMAGE_FORMATS = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+}
+
+
+class _BodyTooLarge(HTTPException):
+    # An HTTPException so FastAPI's body parsing re-raises it as-is instead of turning it into a 400
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=_too_large_detail(max_bytes))
+
+
+def _too_large_detail(max_bytes: int) -> str:
+    return f"Upload exceeds {max_bytes // (1024 * 1024)} MB limit"
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Hard cap on multipart request bodies.
+
+    Rejects on Content-Length before a byte is read, and counts bytes as they
+    stream in for chunked uploads, so an oversized file is cut off at the cap
+    instead of being spooled to disk in full.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _BodyTooLarge(self.max_bytes)
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._reject(send)
+
+    @staticmethod
+    def _is_multipart(scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                return value.startswith(b"multipart/form-data")
+        return False
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": _too_large_detail(self.max_bytes)}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+@dataclass
+class ImageUpload:
+    file: BinaryIO  # Spooled temp file: in memory when small, on disk beyond that
+    extension: str
+    content_type: str
+    width: int
+    height: int
+
+
+def _sniff(file: BinaryIO):
+    """(format, (width, height)) from the header; size is None when PIL refuses it as a decompression bomb."""
+    file.seek(0)
+    try:
+        # Only parses the header; pixel data is not decoded here
+        with Image.open(file) as img:
+            return img.format, img.size
+    except Image.DecompressionBombError:
+        # Over twice PIL's pixel limit: far beyond UPLOAD_MAX_PIXELS, whatever the format
+        return None, None
+    except (UnidentifiedImageError, OSError):
+        return None, (0, 0)
+    finally:
+        file.seek(0)
+
+
+async def read_image_upload(upload: UploadFile) -> ImageUpload:
+    """Validate an uploaded image from its header without reading it into memory."""
+    image_format, size = await asyncio.to_thread(_sniff, upload.file)
+    if size is None:
+        raise HTTPException(status_code=413, detail="Image dimensions are too large")
+    width, height = size
+
+    if image_format not in ALLOWED_IMAGE_FORMATS:
+        raise HTTPException(status_code=415, detail="Unsupported file type, please upload a JPG, PNG or WEBP image")
+    if width * height > settings.UPLOAD_MAX_PIXELS:
+        raise HTTPException(status_code=413, detail="Image dimensions are too large")
+
+    extension, content_type = ALLOWED_IMAGE_FORMATS[image_format]
+    return ImageUpload(upload.file, extension, content_type, width, height)